@@ -4,19 +4,27 @@ from __future__ import unicode_literals, division, absolute_import, print_functi
 import os
 import threading
 import sys
+import time
+import traceback
+import json
+import hashlib
+import glob
+import subprocess
 import shellenv
 import sublime
 
 if sys.version_info < (3,):
+    import Queue as queue
     str_cls = unicode  # noqa
     py2 = True
 else:
+    import queue
     str_cls = str
     py2 = False
 
 
-__version__ = '0.9.0'
-__version_info__ = (0, 9, 0)
+__version__ = '0.10.0'
+__version_info__ = (0, 10, 0)
 
 
 # The sublime.platform() function will not be available in ST3 upon initial
@@ -36,6 +44,437 @@ _platform = {
 _NO_VALUE = '\x01\x02\x03\x04\x05\x06\x07\x08\x09\x0A\x0B\x0C\x0D\x0E\x0F'
 
 
+class _LruCache():
+
+    """
+    A mapping that holds a limited number of entries, discarding the least
+    recently used entries once full. Entries may optionally expire after a
+    number of seconds. Counts of hits, misses, evictions and expirations are
+    kept for cache_stats(). Safe to use from multiple threads.
+    """
+
+    name = None
+    max_entries = None
+    ttl = None
+    _data = None
+    _tick = None
+    _lock = None
+    _counts = None
+
+    def __init__(self, name, max_entries, ttl=None):
+        """
+        :param name:
+            A unicode string of the name of the cache, used by cache_stats()
+
+        :param max_entries:
+            An integer of the maximum number of entries to hold
+
+        :param ttl:
+            None if entries do not expire, otherwise a number of seconds after
+            which an entry is discarded
+        """
+
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = {}
+        self._tick = 0
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        """
+        Checks for an unexpired entry, without marking it as recently used or
+        counting a hit or miss
+
+        :param key:
+            The key of the entry
+
+        :return:
+            A boolean
+        """
+
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[2] is None or entry[2] > time.time())
+
+    def get(self, key, default=None):
+        """
+        Fetches an entry, marking it as recently used
+
+        :param key:
+            The key of the entry
+
+        :param default:
+            The value to return if there is no entry for the key
+
+        :return:
+            The value of the entry, or default
+        """
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.time():
+                del self._data[key]
+                self._counts['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._counts['misses'] += 1
+                return default
+            self._counts['hits'] += 1
+            self._tick += 1
+            entry[1] = self._tick
+            return entry[0]
+
+    def peek(self, key, default=None):
+        """
+        Fetches an entry without marking it as recently used or counting a hit
+        or miss. An entry that has expired but not yet been discarded is
+        returned.
+
+        :param key:
+            The key of the entry
+
+        :param default:
+            The value to return if there is no entry for the key
+
+        :return:
+            The value of the entry, or default
+        """
+
+        with self._lock:
+            entry = self._data.get(key)
+            return default if entry is None else entry[0]
+
+    def set(self, key, value):
+        """
+        Adds or replaces an entry. When the cache is full, the least recently
+        used quarter of the entries are discarded, so that the cost of sorting
+        the entries is spread across many calls.
+
+        :param key:
+            The key of the entry
+
+        :param value:
+            The value of the entry
+        """
+
+        with self._lock:
+            self._tick += 1
+            expires = None if self.ttl is None else time.time() + self.ttl
+            self._data[key] = [value, self._tick, expires]
+            if len(self._data) > self.max_entries:
+                by_age = sorted(self._data.items(), key=lambda item: item[1][1])
+                evict = by_age[0:max(1, len(by_age) // 4)]
+                for old_key, _ in evict:
+                    del self._data[old_key]
+                self._counts['evictions'] += len(evict)
+
+    def pop(self, key, default=None):
+        """
+        Removes an entry, if present
+
+        :param key:
+            The key of the entry
+
+        :param default:
+            The value to return if there is no entry for the key
+
+        :return:
+            The value of the entry, or default
+        """
+
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def items(self):
+        """
+        Lists the unexpired entries, without marking them as recently used
+
+        :return:
+            A list of two-element tuples of the key and value
+        """
+
+        now = time.time()
+        with self._lock:
+            output = []
+            for key, (value, _, expires) in self._data.items():
+                if expires is None or expires > now:
+                    output.append((key, value))
+            return output
+
+    def keys(self):
+        """
+        Lists the keys of the unexpired entries
+
+        :return:
+            A list of the keys
+        """
+
+        return [key for key, _ in self.items()]
+
+    def clear(self):
+        """
+        Removes all entries. The counts are not reset.
+        """
+
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        :return:
+            A dict as described by cache_stats()
+        """
+
+        with self._lock:
+            output = dict(self._counts)
+            output['entries'] = len(self._data)
+            output['max_entries'] = self.max_entries
+            return output
+
+    def reset_stats(self):
+        """
+        Sets the counts of hits, misses, evictions and expirations to zero
+        """
+
+        with self._lock:
+            for name in self._counts:
+                self._counts[name] = 0
+
+
+# Incremented by invalidate() whenever golang.sublime-settings, a project or
+# the environment may have changed. All of the caches below are cleared at the
+# same time.
+_generation = 0
+
+# If invalidate() has been registered as an on_change callback of the
+# golang.sublime-settings object
+_settings_watched = False
+
+
+# The boolean settings from golang.sublime-settings that change the behavior
+# of golangconfig, and are copied into SettingsSnapshot objects
+_FLAG_NAMES = ['debug', 'path_index', 'profile', 'parallel_path', 'go_env']
+
+# Values looked up from golang.sublime-settings by _SettingsIndex objects. The
+# keys are unicode string setting names and the values are two-element tuples
+# as returned by _SettingsIndex.get().
+_st_values = _LruCache('st_values', 256)
+
+# Boolean flags from golang.sublime-settings, such as "debug", keyed by the
+# unicode string setting name
+_st_flags = _LruCache('st_flags', len(_FLAG_NAMES))
+
+
+# Listings of PATH directories used when the "path_index" setting is enabled.
+# The keys are unicode string directory paths and the values are a tuple of
+# (directory modification time, set of entry names, time the modification time
+# was last checked). A listing is used without touching the filesystem for
+# _DIR_INDEX_TTL seconds after it is checked, and after that for as long as the
+# directory modification time does not change.
+_dir_index = _LruCache('dir_index', 256)
+
+# The number of seconds a listing in _dir_index is trusted for before the
+# modification time of the directory is checked again
+_DIR_INDEX_TTL = 5.0
+
+# Directories modified within this many seconds of being listed are not added to
+# _dir_index, since a file added within the resolution of the filesystem
+# timestamps would not change the modification time of the directory
+_DIR_INDEX_MIN_AGE = 2.0
+
+
+# The number of seconds a path in _existing_dirs is trusted for
+_EXISTING_DIRS_TTL = 30.0
+
+# Paths from GOPATH and GOROOT that setting_value() found to exist. The keys
+# are unicode string paths and the values are True. Paths that do not exist
+# are never cached so that a newly-created directory is picked up immediately.
+_existing_dirs = _LruCache('existing_dirs', 256, _EXISTING_DIRS_TTL)
+
+
+# The number of seconds _probe_dirs() waits for the probe of a directory,
+# counted from when the probe starts
+_PROBE_TIMEOUT = 0.5
+
+# The number of probes of a single directory that may be queued or running in
+# _probe_pool at once. Probes stuck on a hung mount count towards this, so
+# later lookups do not keep adding work for the same directory.
+_PROBE_MAX_IN_FLIGHT = 2
+
+# The number of probes that may run past _PROBE_TIMEOUT before directories
+# that already have a probe queued or running are no longer probed. This is
+# half of the threads in _probe_pool, so that hung mounts leave threads free
+# for the other directories in the PATH.
+_PROBE_MAX_STUCK = 4
+
+# The number of probes of each directory that are queued or running. The keys
+# are unicode string paths and the values are integers. Guarded by
+# _probes_lock.
+_probes_in_flight = {}
+_probes_lock = threading.Lock()
+
+# The number of probes that ran past _PROBE_TIMEOUT and have not finished.
+# Guarded by _probes_lock.
+_stuck_probes = 0
+
+# The number of seconds a directory in _dead_dirs is skipped for
+_DEAD_DIRS_TTL = 30.0
+
+# PATH directories whose probe by _probe_dirs() ran for longer than
+# _PROBE_TIMEOUT. The keys are unicode string paths and the values are True.
+_dead_dirs = _LruCache('dead_dirs', 64, _DEAD_DIRS_TTL)
+
+
+# Env dicts built by _overlay_env(). The keys are tuples of (encoded variable
+# name, encoded value or None) pairs that were applied to the env from the
+# user's login shell. The key () holds the unmodified env from the shell.
+_env_cache = _LruCache('env', 32)
+
+# Byte strings produced by _env_encode() and _path_encode() on Python 2. The
+# keys are a tuple of ("env" or "path", unicode string).
+_encode_cache = _LruCache('encode', 1024)
+
+# The _SettingsIndex objects created by _settings_index() for views. The keys
+# are the integer view ids and the values are a two-element tuple of (window
+# id, project file name) and the _SettingsIndex object.
+_view_cache = _LruCache('view', 64)
+
+
+# Executables that have been located by executable_path(). The keys are a
+# tuple of (executable name with suffix, PATH setting, PATH setting source) and
+# the values are a tuple of (path, source, shell PATH, stat signature). The
+# shell PATH is None when the executable was found via the PATH setting. An
+# entry is only used when the stat signature of the executable is unchanged.
+_executable_cache = _LruCache('executable', 256)
+
+
+# The output of "go env -json" for each go executable, used when the "go_env"
+# setting is enabled. The keys are unicode string paths to the executable and
+# the values are a four-element tuple of the _stat_signature() of the
+# executable, a dict of the variables, and for a run that failed, the
+# time.time() value when go should be run again and the number of seconds that
+# was waited. Failed runs are retried with the same backoff as
+# _missing_executables. For successful runs the last two elements are None.
+_go_env_cache = _LruCache('go_env', 8)
+
+# The variables that may be filled in from the output of "go env -json"
+_GO_ENV_VARS = set(['GOROOT', 'GOPATH', 'GOMODCACHE', 'GOCACHE'])
+
+# The number of seconds "go env -json" may run for before it is killed. Only
+# used on Sublime Text 3, since Python 2 can not time out a subprocess.
+_GO_ENV_TIMEOUT = 5.0
+
+
+# Executables that executable_path() could not find. The keys are the same as
+# _executable_cache and the values are a list of [time.time() value when the
+# entry expires, seconds the entry was valid for, shell PATH, tuple of the
+# (directory, modification time) of each directory searched, search trace from
+# _search_trace()].
+_missing_executables = _LruCache('missing_executables', 256)
+
+# The number of seconds a new entry in _missing_executables is valid for. Each
+# time an entry expires and the modification times of the directories have not
+# changed, it is renewed for twice as long, up to _MISSING_MAX_BACKOFF.
+_MISSING_MIN_BACKOFF = 2.0
+
+# Once an entry in _missing_executables has been valid for this many seconds,
+# the directories are searched again, even if they appear unchanged, since
+# making an existing file executable does not change the directory
+_MISSING_MAX_BACKOFF = 64.0
+
+
+# Go installations found by _toolchain(). The keys are unicode string GOROOT
+# paths and the values are a tuple of (modification time of the bin directory,
+# None or a unicode string of the version from the VERSION file, set of the
+# names of the executables in the bin directory). The names are lowercased on
+# Windows. Entries are kept by invalidate(), since the modification time of the
+# bin directory is checked each time an entry is used.
+_toolchains = _LruCache('toolchains', 32)
+
+# Patterns, as used by glob.glob(), of the directories Go is commonly installed
+# in. These are checked by toolchains() in addition to GOROOT and the PATH.
+_TOOLCHAIN_DIRS = {
+    'windows': ['C:\\Go', '~\\sdk\\go*'],
+    'osx': ['/usr/local/go', '/usr/local/opt/go/libexec', '/opt/homebrew/opt/go/libexec', '~/sdk/go*'],
+    'linux': ['/usr/local/go', '/usr/lib/go', '/usr/lib/go-*', '/snap/go/current', '~/sdk/go*'],
+}[_platform]
+
+
+# Every cache, for invalidate() and cache_stats()
+_caches = [
+    _st_values,
+    _st_flags,
+    _dir_index,
+    _existing_dirs,
+    _dead_dirs,
+    _env_cache,
+    _encode_cache,
+    _view_cache,
+    _executable_cache,
+    _go_env_cache,
+    _missing_executables,
+    _toolchains,
+]
+
+
+# The path of the file that the executable locations and existing GOPATH and
+# GOROOT directories are saved to, so they survive restarts of Sublime Text.
+# This is set by _load_state(), and is None if Sublime Text does not provide a
+# cache directory (ST2).
+_state_path = None
+
+# If _load_state() has been called
+_state_loaded = False
+
+# If a call to _save_state() is pending
+_save_scheduled = False
+
+# The number of milliseconds to wait after a cache changes before saving, so
+# that a burst of changes results in a single write
+_SAVE_DELAY = 5000
+
+# Increment when the format of the file at _state_path changes
+_STATE_VERSION = 1
+
+
+# If the duration and filesystem calls of each stage of resolution should be
+# recorded in _stats. This is set by _settings_index() from the "profile" and
+# "debug" settings.
+_profiling = False
+
+# Measurements recorded by _profiled(). The keys are unicode string stage names
+# and the values are a list of [number of calls, number of filesystem calls,
+# list of the most recent durations in seconds].
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Callbacks registered via add_on_event(). The keys are the unicode string
+# keys passed to add_on_event() and the values are the callbacks.
+_event_callbacks = {}
+
+# The number of durations kept for each stage in _stats
+_STATS_SAMPLES = 1000
+
+# The .fs_calls attribute counts the filesystem calls made by _fs() in the
+# current thread
+_profile_local = threading.local()
+
+# time.clock() has a much higher resolution than time.time() on Windows, and
+# time.perf_counter() replaces both in Python 3.3
+if hasattr(time, 'perf_counter'):
+    _timer = time.perf_counter
+elif sys.platform == 'win32':
+    _timer = time.clock
+else:
+    _timer = time.time
+
+
 class EnvVarError(EnvironmentError):
 
     """
@@ -94,6 +533,295 @@ def debug_enabled():
     return False if value == '0' else bool(value)
 
 
+def invalidate():
+    """
+    Discards all cached settings, executable locations, directory checks and
+    env dicts. The Go installations found by toolchains() and the listings of
+    PATH directories for the "path_index" setting are kept, since they do not
+    depend on the settings and are checked against the filesystem.
+    This is called automatically when golang.sublime-settings is changed.
+    Packages should call it when the user's environment changes in a way
+    golangconfig can not detect itself, such as when a .sublime-project file is
+    saved.
+
+    Any GoEnvSnapshot objects created before the call will return False from
+    .is_current(). The copy of the caches saved to disk is also cleared.
+    """
+
+    global _generation
+
+    _generation += 1
+    for cache in _caches:
+        if cache is not _toolchains and cache is not _dir_index:
+            cache.clear()
+    _schedule_save()
+
+
+def view_closed(view):
+    """
+    Discards the settings cached for a view. Packages should call this from
+    the on_close() method of an EventListener, so the cache does not hold on
+    to the settings of views that no longer exist.
+
+    :param view:
+        A sublime.View object
+
+    :raises:
+        TypeError
+            When view is not a sublime.View object
+    """
+
+    if not isinstance(view, sublime.View):
+        raise TypeError('view must be an instance of sublime.View, not %s' % _type_name(view))
+
+    _view_cache.pop(view.id())
+
+
+def generation():
+    """
+    Returns a counter that is incremented every time invalidate() is called,
+    allowing packages to cheaply detect that data they have derived from
+    golangconfig is out of date
+
+    :return:
+        An integer
+    """
+
+    return _generation
+
+
+def stats():
+    """
+    Returns the timing information recorded while the "profile" or "debug"
+    setting is enabled. Each stage of resolution is timed separately, and the
+    time of a stage includes the stages it calls - "setting_value" includes
+    "shellenv", for instance.
+
+    :return:
+        A dict with unicode string keys of the stage names:
+
+         - "settings" - reading the view, window and global settings
+         - "project_data" - fetching project data from Sublime Text
+         - "shellenv" - reading the environment of the user's login shell
+         - "setting_value" - looking up a setting, and checking GOPATH/GOROOT
+         - "executable_path" - searching the PATH for an executable
+         - "executable_paths" - searching the PATH for multiple executables
+         - "build_env" - constructing the env for subprocess.Popen()
+         - "go_env" - running "go env -json"
+         - "toolchains" - finding Go installations for toolchains()
+         - "subprocess_info" - all of the work of subprocess_info()
+
+        Each value is a dict with the keys:
+
+         - "count" - an integer of the number of calls
+         - "fs_calls" - an integer of the number of filesystem calls made
+         - "p50" - a float of the median duration, in seconds
+         - "p95" - a float of the 95th percentile duration, in seconds
+         - "max" - a float of the longest duration, in seconds
+
+        The durations are calculated from the most recent 1000 calls.
+    """
+
+    output = {}
+    with _stats_lock:
+        for stage, (count, fs_calls, durations) in _stats.items():
+            durations = sorted(durations)
+            last = len(durations) - 1
+            output[stage] = {
+                'count': count,
+                'fs_calls': fs_calls,
+                'p50': durations[int(last * 0.5)],
+                'p95': durations[int(last * 0.95)],
+                'max': durations[last],
+            }
+    return output
+
+
+def cache_stats():
+    """
+    Returns the size and effectiveness of each of the caches used by
+    golangconfig. Unlike stats(), the counts are always recorded.
+
+    :return:
+        A dict with unicode string keys of the cache names:
+
+         - "st_values" - values from golang.sublime-settings
+         - "st_flags" - boolean flags from golang.sublime-settings
+         - "view" - the settings of each view
+         - "executable" - the locations of executables
+         - "missing_executables" - executables that could not be found
+         - "dir_index" - listings of PATH directories, for "path_index"
+         - "existing_dirs" - GOPATH and GOROOT directories known to exist
+         - "dead_dirs" - PATH directories that did not respond, for
+           "parallel_path"
+         - "env" - env dicts for subprocess.Popen()
+         - "encode" - byte strings of env values and paths, on ST2
+         - "go_env" - the output of "go env -json", for "go_env"
+         - "toolchains" - Go installations found by toolchains()
+
+        Each value is a dict with the keys:
+
+         - "entries" - an integer of the number of entries held
+         - "max_entries" - an integer of the number of entries held before the
+           least recently used are discarded
+         - "hits" - an integer of the number of lookups that found an entry
+         - "misses" - an integer of the number of lookups that did not
+         - "evictions" - an integer of the number of entries discarded to
+           make room for new ones
+         - "expirations" - an integer of the number of entries discarded
+           because they were too old to use
+    """
+
+    output = {}
+    for cache in _caches:
+        output[cache.name] = cache.stats()
+    return output
+
+
+def print_stats():
+    """
+    Prints the information from stats() and cache_stats() to the Sublime Text
+    console
+    """
+
+    print('golangconfig: %-18s %8s %9s %9s %9s %9s' % ('stage', 'calls', 'p50 ms', 'p95 ms', 'max ms', 'fs calls'))
+    stage_stats = stats()
+    for stage in sorted(stage_stats.keys()):
+        info = stage_stats[stage]
+        print(
+            'golangconfig: %-18s %8d %9.2f %9.2f %9.2f %9d' %
+            (
+                stage,
+                info['count'],
+                info['p50'] * 1000,
+                info['p95'] * 1000,
+                info['max'] * 1000,
+                info['fs_calls']
+            )
+        )
+
+    print('golangconfig: %-20s %7s %7s %9s %9s %9s %9s' % (
+        'cache', 'size', 'max', 'hits', 'misses', 'evictions', 'expired'
+    ))
+    all_cache_stats = cache_stats()
+    for name in sorted(all_cache_stats.keys()):
+        info = all_cache_stats[name]
+        print(
+            'golangconfig: %-20s %7d %7d %9d %9d %9d %9d' %
+            (
+                name,
+                info['entries'],
+                info['max_entries'],
+                info['hits'],
+                info['misses'],
+                info['evictions'],
+                info['expirations']
+            )
+        )
+
+
+def reset_stats():
+    """
+    Discards the timing information returned by stats(), and sets the counts
+    returned by cache_stats() to zero
+    """
+
+    with _stats_lock:
+        _stats.clear()
+    for cache in _caches:
+        cache.reset_stats()
+
+
+def add_on_event(key, callback):
+    """
+    Registers a callback to receive the events that occur while locating
+    executables and building env dicts. This is intended for forwarding to
+    logging or telemetry. The callback may be called from any thread, and
+    should return quickly.
+
+    The following events are sent, with the listed keys in the details dict:
+
+     - "executable_cache_hit" - "name", "path", "source"
+     - "executable_cache_miss" - "name"
+     - "executable_found" - "name", "path", "source"
+     - "executable_not_found" - "name", "cached" - a boolean, if the
+       executable was previously not found and the PATH directories have not
+       changed since
+     - "path_not_found" - "name" of "GOPATH" or "GOROOT", "directories" - a
+       list of unicode strings of the directories that do not exist
+     - "path_dir_timeout" - "directory" - a unicode string of a PATH directory
+       that did not respond in time, with the "parallel_path" setting enabled
+     - "env_cache_hit" - no details
+     - "env_cache_miss" - no details
+     - "env_built" - "required_vars", "optional_vars" and "missing_vars" -
+       lists of unicode strings of the variable names
+
+    :param key:
+        A unicode string to identify the callback, for use with
+        clear_on_event(). Registering a second callback with the same key
+        replaces the first.
+
+    :param callback:
+        A callable that accepts two arguments - a unicode string of the event
+        name and a dict of details
+    """
+
+    _require_unicode('key', key)
+    if not callable(callback):
+        raise TypeError('callback must be callable, not %s' % _type_name(callback))
+
+    _event_callbacks[key] = callback
+
+
+def clear_on_event(key):
+    """
+    Removes a callback registered via add_on_event()
+
+    :param key:
+        A unicode string of the key passed to add_on_event()
+    """
+
+    _event_callbacks.pop(key, None)
+
+
+def _profiled(stage):
+    """
+    Creates a decorator that records the duration and number of filesystem
+    calls of a function in _stats, when _profiling is enabled
+
+    :param stage:
+        A unicode string of the name of the stage to record the calls under
+
+    :return:
+        A function that accepts a function and returns the wrapped function
+    """
+
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            if not _profiling:
+                return func(*args, **kwargs)
+            fs_calls = getattr(_profile_local, 'fs_calls', 0)
+            start = _timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = _timer() - start
+                fs_calls = getattr(_profile_local, 'fs_calls', 0) - fs_calls
+                with _stats_lock:
+                    if stage not in _stats:
+                        _stats[stage] = [0, 0, []]
+                    stage_stats = _stats[stage]
+                    stage_stats[0] += 1
+                    stage_stats[1] += fs_calls
+                    stage_stats[2].append(duration)
+                    if len(stage_stats[2]) > _STATS_SAMPLES:
+                        del stage_stats[2][0]
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    return decorator
+
+
 def subprocess_info(executable_name, required_vars, optional_vars=None, view=None, window=None):
     """
     Gathers and formats information necessary to use subprocess.Popen() to
@@ -158,124 +886,86 @@ def subprocess_info(executable_name, required_vars, optional_vars=None, view=Non
          - [1] A dict to pass to the env parameter of subprocess.Popen()
     """
 
-    path, _ = executable_path(executable_name, view=view, window=window)
-    if path is None:
-        name = executable_name
-        if sys.platform == 'win32':
-            name += '.exe'
-        dirs = []
-        settings_path, _ = _get_most_specific_setting('PATH', view=view, window=window)
-        if settings_path and settings_path != _NO_VALUE:
-            dirs.extend(settings_path.split(os.pathsep))
-        _, shell_dirs = shellenv.get_path()
-        for shell_dir in shell_dirs:
-            if shell_dir not in dirs:
-                dirs.append(shell_dir)
-        exception = ExecutableError(
-            'The executable "%s" could not be located in any of the following locations: "%s"' %
-            (
-                name,
-                '", "'.join(dirs)
-            )
-        )
-        exception.name = name
-        exception.dirs = dirs
-        raise exception
-
-    path = shellenv.path_encode(path)
-
-    _, env = shellenv.get_env(for_subprocess=True)
+    _require_unicode('executable_name', executable_name)
+    _check_view_window(view, window)
 
-    var_groups = [required_vars]
-    if optional_vars:
-        var_groups.append(optional_vars)
+    return _subprocess_info(executable_name, required_vars, optional_vars, _settings_index(view, window))
 
-    missing_vars = []
 
-    for var_names in var_groups:
-        for var_name in var_names:
-            value, _ = setting_value(var_name, view=view, window=window)
-            var_key = var_name
+def settings_snapshot(setting_names, view=None, window=None):
+    """
+    Captures the settings necessary to call subprocess_info_from_snapshot()
+    from a thread other than the UI thread. The snapshot contains plain data
+    copied from the Sublime Text API, so all filesystem access, such as
+    checking the PATH and GOPATH directories, can happen in the background.
 
-            if value is not None:
-                value = str_cls(value)
-                value = shellenv.env_encode(value)
-            var_key = shellenv.env_encode(var_key)
+    :param setting_names:
+        A list of unicode strings of the settings to capture. This must
+        include all of the required_vars and optional_vars that will be passed
+        to subprocess_info_from_snapshot(). The PATH setting is always
+        captured.
 
-            if value is None:
-                if var_key in env:
-                    del env[var_key]
-                continue
+    :param view:
+        A sublime.View object to use in finding project-specific settings. This
+        should be passed whenever available.
 
-            env[var_key] = value
+    :param window:
+        A sublime.Window object to use in finding project-specific settings.
+        This should be passed whenever available.
 
-    for required_var in required_vars:
-        var_key = shellenv.env_encode(required_var)
-        if var_key not in env:
-            missing_vars.append(required_var)
+    :raises:
+        RuntimeError
+            When the function is called from any thread but the UI thread
+        TypeError
+            When any of the parameters are of the wrong type
 
-    if missing_vars:
-        missing_vars = sorted(missing_vars, key=lambda s: s.lower())
-        exception = EnvVarError(
-            'The following environment variable%s currently unset: %s' %
-            (
-                's are' if len(missing_vars) > 1 else ' is',
-                ', '.join(missing_vars)
-            )
-        )
-        exception.missing = missing_vars
-        raise exception
+    :return:
+        A golangconfig.SettingsSnapshot object
+    """
 
-    encoded_goroot = shellenv.env_encode('GOROOT')
-    if encoded_goroot in env:
-        unicode_sep = shellenv.path_decode(os.sep)
-        name = executable_name
-        if sys.platform == 'win32':
-            name += '.exe'
-        relative_executable_path = shellenv.path_encode('bin%s%s' % (unicode_sep, name))
-        goroot_executable_path = os.path.join(env[encoded_goroot], relative_executable_path)
-        if goroot_executable_path != path:
-            print(
-                'golangconfig: warning - binary %s was found at "%s", which is not inside of the GOROOT "%s"' %
-                (
-                    executable_name,
-                    path,
-                    shellenv.path_decode(env[encoded_goroot])
-                )
-            )
+    if not isinstance(setting_names, (list, tuple)):
+        raise TypeError('setting_names must be a list, not %s' % _type_name(setting_names))
+    for setting_name in setting_names:
+        _require_unicode('setting_name', setting_name)
+    _check_view_window(view, window)
 
-    return (path, env)
+    return _settings_index(view, window).freeze(list(setting_names) + ['PATH'])
 
 
-def setting_value(setting_name, view=None, window=None):
+def subprocess_info_from_snapshot(snapshot, executable_name, required_vars, optional_vars=None):
     """
-    Returns the user's setting for a specific variable, such as GOPATH or
-    GOROOT. Supports global and per-platform settings. Finds settings by
-    looking in:
-
-    1. If a project is open, the project settings
-    2. The global golang.sublime-settings file
-    3. The user's environment variables, as defined by their login shell
+    Performs the same work as subprocess_info(), using settings captured by
+    settings_snapshot(). This function may be called from any thread.
 
-    If the setting is a known name, e.g. GOPATH or GOROOT, the value will be
-    checked to ensure the path exists.
+    :param snapshot:
+        A golangconfig.SettingsSnapshot object from settings_snapshot()
 
-    :param setting_name:
-        A unicode string of the setting to retrieve
+    :param executable_name:
+        A unicode string of the executable to locate, e.g. "go" or "gofmt"
 
-    :param view:
-        A sublime.View object to use in finding project-specific settings. This
-        should be passed whenever available.
+    :param required_vars:
+        A list of unicode strings of the environment variables that are
+        required, e.g. "GOPATH"
 
-    :param window:
-        A sublime.Window object to use in finding project-specific settings.
-        This should be passed whenever available.
+    :param optional_vars:
+        A list of unicode strings of the environment variables that are
+        optional, but should be used if available - e.g. "GOOS", "GOARCH"
 
     :raises:
-        RuntimeError
-            When the function is called from any thread but the UI thread
         TypeError
             When any of the parameters are of the wrong type
+        ValueError
+            When one of the required_vars or optional_vars was not captured
+            in the snapshot
+        golangconfig.ExecutableError
+            When the executable requested could not be located. The .name
+            attribute contains the name of the executable that could not be
+            located. The .dirs attribute contains a list of unicode strings
+            of the directories searched.
+        golangconfig.EnvVarError
+            When one or more required_vars are not available. The .missing
+            attribute will be a list of the names of missing environment
+            variables.
         golangconfig.GoPathNotFoundError
             When one or more directories specified by the GOPATH environment
             variable could not be found on disk. The .directories attribute will
@@ -286,89 +976,431 @@ def setting_value(setting_name, view=None, window=None):
             the directory that could not be found.
 
     :return:
-        A two-element tuple.
+        A two-element tuple, as returned by subprocess_info()
 
-        If no setting was found, the return value will be:
+         - [0] A unicode string (byte string for ST2) of the path to the executable
+         - [1] A dict to pass to the env parameter of subprocess.Popen()
+    """
 
-         - [0] None
-         - [1] None
+    if not isinstance(snapshot, SettingsSnapshot):
+        raise TypeError('snapshot must be an instance of golangconfig.SettingsSnapshot, not %s' % _type_name(snapshot))
+    _require_unicode('executable_name', executable_name)
 
-        If a setting was found, the return value will be:
+    return _subprocess_info(executable_name, required_vars, optional_vars, snapshot)
 
-         - [0] The setting value
-         - [1] The source of the setting, a unicode string:
-           - "project file (os-specific)"
-           - "golang.sublime-settings (os-specific)"
-           - "project file"
-           - "golang.sublime-settings"
-           - A unicode string of the path to the user's login shell
 
-        The second element of the tuple is intended to be used in the display
-        of debugging information to end users.
+def subprocess_info_async(executable_name, required_vars, optional_vars=None, view=None, window=None,
+                          callback=None):
     """
+    Performs the same work as subprocess_info(), except that only the settings
+    are read in the UI thread. Locating the executable and checking the
+    environment variables happens in a background thread, and the result is
+    passed to the callback in the UI thread.
 
-    _require_unicode('setting_name', setting_name)
-    _check_view_window(view, window)
+    :param executable_name:
+        A unicode string of the executable to locate, e.g. "go" or "gofmt"
 
-    setting, source = _get_most_specific_setting(setting_name, view, window)
+    :param required_vars:
+        A list of unicode strings of the environment variables that are
+        required, e.g. "GOPATH". Obtains values from setting_value().
 
-    if setting == _NO_VALUE:
-        setting = None
-        source = None
+    :param optional_vars:
+        A list of unicode strings of the environment variables that are
+        optional, but should be pulled from setting_value() if available - e.g.
+        "GOOS", "GOARCH". Obtains values from setting_value().
 
-        shell, env = shellenv.get_env()
-        if setting_name in env:
-            source = shell
-            setting = env[setting_name]
+    :param view:
+        A sublime.View object to use in finding project-specific settings. This
+        should be passed whenever available.
 
-    if setting_name not in set(['GOPATH', 'GOROOT']):
-        return (setting, source)
+    :param window:
+        A sublime.Window object to use in finding project-specific settings.
+        This should be passed whenever available.
 
-    if setting is None and source is None:
-        return (setting, source)
+    :param callback:
+        A callable that accepts two parameters. On success, the first will be
+        the two-element tuple that subprocess_info() returns and the second
+        will be None. On failure, the first will be None and the second will be
+        the exception that subprocess_info() would have raised, such as
+        golangconfig.ExecutableError or golangconfig.EnvVarError.
 
-    # We add some extra processing here for known settings to improve the
-    # user experience, especially around debugging
-    _debug_unicode_string(setting_name, setting, source)
+    :raises:
+        RuntimeError
+            When the function is called from any thread but the UI thread
+        TypeError
+            When any of the parameters are of the wrong type
+    """
 
-    if not isinstance(setting, str_cls):
-        setting = str_cls(setting)
+    _require_unicode('executable_name', executable_name)
+    if not callable(callback):
+        raise TypeError('callback must be callable, not %s' % _type_name(callback))
 
-    if setting_name == 'GOROOT':
-        if os.path.exists(setting):
-            return (setting, source)
+    setting_names = list(required_vars)
+    if optional_vars:
+        setting_names.extend(optional_vars)
+    snapshot = settings_snapshot(setting_names, view=view, window=window)
 
-    has_multiple = False
-    if setting_name == 'GOPATH':
-        values = setting.split(os.pathsep)
-        has_multiple = len(values) > 1
-        missing = []
+    def resolve():
+        try:
+            result = _subprocess_info(executable_name, required_vars, optional_vars, snapshot)
+            error = None
+        except (Exception) as e:
+            result = None
+            error = e
+        sublime.set_timeout(lambda: callback(result, error), 0)
 
-        for value in values:
-            if not os.path.exists(value):
-                missing.append(value)
+    _worker_pool.submit(resolve)
 
-        if not missing:
-            return (setting, source)
 
-    if setting_name == 'GOROOT':
-        message = 'The GOROOT environment variable value "%s" does not exist on the filesystem'
-        e = GoRootNotFoundError(message % setting)
-        e.directory = setting
-        raise e
+def prewarm(executable_names, var_names, view=None, window=None, callback=None):
+    """
+    Fills the caches used by subprocess_info() from a background thread, so
+    that the first call does not have to wait for the user's login shell to be
+    invoked, or for the PATH and GOPATH directories to be checked. This is
+    intended to be called from the plugin_loaded() function of a package.
 
-    if not has_multiple:
-        suffix = 'value "%s" does not exist on the filesystem' % missing[0]
-    elif len(missing) == 1:
-        suffix = 'contains the directory "%s" that does not exist on the filesystem' % missing[0]
-    else:
-        paths = ', '.join('"' + path + '"' for path in missing)
-        suffix = 'contains %s directories that do not exist on the filesystem: %s' % (len(missing), paths)
+    Errors, such as an executable that could not be found, are not reported,
+    since they will be raised by the later call to subprocess_info().
 
-    message = 'The GOPATH environment variable ' + suffix
-    e = GoPathNotFoundError(message)
-    e.directories = missing
-    raise e
+    :param executable_names:
+        A list of unicode strings of the executables to locate, e.g. "go" and
+        "gofmt"
+
+    :param var_names:
+        A list of unicode strings of the environment variables to look up and
+        check, e.g. "GOPATH" and "GOROOT"
+
+    :param view:
+        A sublime.View object to use in finding project-specific settings
+
+    :param window:
+        A sublime.Window object to use in finding project-specific settings
+
+    :param callback:
+        None, or a callable that accepts no parameters, to call in the UI
+        thread once the caches have been filled
+
+    :raises:
+        RuntimeError
+            When the function is called from any thread but the UI thread
+        TypeError
+            When any of the parameters are of the wrong type
+    """
+
+    if not isinstance(executable_names, (list, tuple)):
+        raise TypeError('executable_names must be a list, not %s' % _type_name(executable_names))
+    for executable_name in executable_names:
+        _require_unicode('executable_name', executable_name)
+    if callback is not None and not callable(callback):
+        raise TypeError('callback must be callable, not %s' % _type_name(callback))
+
+    snapshot = settings_snapshot(var_names, view=view, window=window)
+
+    def warm():
+        try:
+            _shell_env(for_subprocess=True)
+            _executable_paths(executable_names, snapshot)
+            for var_name in var_names:
+                try:
+                    value, _ = _setting_value(var_name, snapshot)
+                    if var_name == 'GOROOT' and isinstance(value, str_cls):
+                        _toolchain(os.path.normpath(value))
+                except (GoPathNotFoundError, GoRootNotFoundError) as e:
+                    if snapshot.debug:
+                        print('golangconfig: prewarm of %s failed - %s' % (var_name, str_cls(e)))
+        finally:
+            if callback is not None:
+                sublime.set_timeout(callback, 0)
+
+    _worker_pool.submit(warm)
+
+
+def env_snapshot(executable_names, required_vars, optional_vars=None, view=None, window=None):
+    """
+    Resolves the executables and environment variables a package needs into a
+    GoEnvSnapshot object. The snapshot may be kept and used for many calls to
+    subprocess.Popen(), instead of calling subprocess_info() each time. A new
+    snapshot should be created when the user's settings change.
+
+    :param executable_names:
+        A list of unicode strings of the executables to locate, e.g. "go" and
+        "gofmt"
+
+    :param required_vars:
+        A list of unicode strings of the environment variables that are
+        required, e.g. "GOPATH". Obtains values from setting_value().
+
+    :param optional_vars:
+        A list of unicode strings of the environment variables that are
+        optional, but should be pulled from setting_value() if available - e.g.
+        "GOOS", "GOARCH". Obtains values from setting_value().
+
+    :param view:
+        A sublime.View object to use in finding project-specific settings. This
+        should be passed whenever available.
+
+    :param window:
+        A sublime.Window object to use in finding project-specific settings.
+        This should be passed whenever available.
+
+    :raises:
+        RuntimeError
+            When the function is called from any thread but the UI thread
+        TypeError
+            When any of the parameters are of the wrong type
+        golangconfig.ExecutableError
+            When one of the executables requested could not be located. The
+            .name attribute contains the name of the executable that could not
+            be located. The .dirs attribute contains a list of unicode strings
+            of the directories searched.
+        golangconfig.EnvVarError
+            When one or more required_vars are not available. The .missing
+            attribute will be a list of the names of missing environment
+            variables.
+        golangconfig.GoPathNotFoundError
+            When one or more directories specified by the GOPATH environment
+            variable could not be found on disk. The .directories attribute will
+            be a list of the directories that could not be found.
+        golangconfig.GoRootNotFoundError
+            When the directory specified by GOROOT environment variable could
+            not be found on disk. The .directory attribute will be the path to
+            the directory that could not be found.
+
+    :return:
+        A golangconfig.GoEnvSnapshot object
+    """
+
+    if not isinstance(executable_names, (list, tuple)):
+        raise TypeError('executable_names must be a list, not %s' % _type_name(executable_names))
+    for executable_name in executable_names:
+        _require_unicode('executable_name', executable_name)
+    _check_view_window(view, window)
+
+    settings = _settings_index(view, window)
+
+    executables = {}
+    for executable_name in executable_names:
+        path, source = _require_executable(executable_name, settings)
+        executables[executable_name] = (path, source, _path_encode(path))
+
+    env, var_values = _build_env(required_vars, optional_vars, settings)
+    for executable_name in executable_names:
+        _check_goroot_executable(executable_name, executables[executable_name][2], env)
+
+    return GoEnvSnapshot(executables, env, var_values, _generation)
+
+
+class GoEnvSnapshot():
+
+    """
+    The executable paths and environment variables resolved by env_snapshot().
+    The values of a snapshot do not change once it has been created.
+    """
+
+    _executables = None
+    _env = None
+    _var_values = None
+    _generation = None
+
+    def __init__(self, executables, env, var_values, generation):
+        """
+        :param executables:
+            A dict with unicode string keys of executable names and values
+            that are a three-element tuple of the unicode string path, the
+            unicode string source of the PATH value and the path encoded for
+            use with subprocess.Popen()
+
+        :param env:
+            A dict to pass to the env parameter of subprocess.Popen()
+
+        :param var_values:
+            A dict with unicode string keys of environment variable names and
+            values that are two-element tuples as returned by setting_value()
+
+        :param generation:
+            An integer of the value of generation() when the snapshot was
+            created
+        """
+
+        self._executables = executables
+        self._env = env
+        self._var_values = var_values
+        self._generation = generation
+
+    @property
+    def executable_names(self):
+        """
+        A sorted list of unicode strings of the executables in the snapshot
+        """
+
+        return sorted(self._executables.keys())
+
+    @property
+    def env(self):
+        """
+        A copy of the dict to pass to the env parameter of subprocess.Popen()
+        """
+
+        return dict(self._env)
+
+    def is_current(self):
+        """
+        Checks if invalidate() has been called since the snapshot was created,
+        meaning that the snapshot may no longer reflect the user's settings
+
+        :return:
+            A boolean - if the snapshot is still current
+        """
+
+        return self._generation == _generation
+
+    def executable_path(self, executable_name):
+        """
+        Returns the path to one of the executables of the snapshot
+
+        :param executable_name:
+            A unicode string of the executable, e.g. "go" or "gofmt"
+
+        :raises:
+            ValueError
+                When the executable was not included in the snapshot
+
+        :return:
+            A two-element tuple of the unicode string path to the executable
+            and the unicode string source of the PATH value, as returned by
+            executable_path()
+        """
+
+        path, source, _ = self._lookup_executable(executable_name)
+        return (path, source)
+
+    def setting_value(self, setting_name):
+        """
+        Returns the value of one of the environment variables of the snapshot
+
+        :param setting_name:
+            A unicode string of the environment variable, e.g. "GOPATH"
+
+        :raises:
+            ValueError
+                When the variable was not included in the snapshot
+
+        :return:
+            A two-element tuple of the setting value and source, as returned
+            by setting_value()
+        """
+
+        if setting_name not in self._var_values:
+            raise ValueError('The setting "%s" is not part of the snapshot' % setting_name)
+        return self._var_values[setting_name]
+
+    def subprocess_info(self, executable_name):
+        """
+        Returns the information necessary to use subprocess.Popen() to run one
+        of the executables of the snapshot
+
+        :param executable_name:
+            A unicode string of the executable, e.g. "go" or "gofmt"
+
+        :raises:
+            ValueError
+                When the executable was not included in the snapshot
+
+        :return:
+            A two-element tuple, as returned by subprocess_info()
+
+             - [0] A unicode string (byte string for ST2) of the path to the executable
+             - [1] A dict to pass to the env parameter of subprocess.Popen()
+        """
+
+        return (self._lookup_executable(executable_name)[2], dict(self._env))
+
+    def _lookup_executable(self, executable_name):
+        """
+        :param executable_name:
+            A unicode string of the executable name
+
+        :raises:
+            ValueError
+                When the executable was not included in the snapshot
+
+        :return:
+            The three-element tuple stored for the executable
+        """
+
+        if executable_name not in self._executables:
+            raise ValueError('The executable "%s" is not part of the snapshot' % executable_name)
+        return self._executables[executable_name]
+
+
+def setting_value(setting_name, view=None, window=None):
+    """
+    Returns the user's setting for a specific variable, such as GOPATH or
+    GOROOT. Supports global and per-platform settings. Finds settings by
+    looking in:
+
+    1. If a project is open, the project settings
+    2. The global golang.sublime-settings file
+    3. The user's environment variables, as defined by their login shell
+    4. If the "go_env" setting is enabled, and the setting is GOROOT, GOPATH,
+       GOMODCACHE or GOCACHE, the output of "go env -json"
+
+    If the setting is a known name, e.g. GOPATH or GOROOT, the value will be
+    checked to ensure the path exists. Paths that exist are remembered for 30
+    seconds before being checked again. Values from "go env -json" are not
+    checked, since the default GOPATH is often not created until it is used.
+
+    :param setting_name:
+        A unicode string of the setting to retrieve
+
+    :param view:
+        A sublime.View object to use in finding project-specific settings. This
+        should be passed whenever available.
+
+    :param window:
+        A sublime.Window object to use in finding project-specific settings.
+        This should be passed whenever available.
+
+    :raises:
+        RuntimeError
+            When the function is called from any thread but the UI thread
+        TypeError
+            When any of the parameters are of the wrong type
+        golangconfig.GoPathNotFoundError
+            When one or more directories specified by the GOPATH environment
+            variable could not be found on disk. The .directories attribute will
+            be a list of the directories that could not be found.
+        golangconfig.GoRootNotFoundError
+            When the directory specified by GOROOT environment variable could
+            not be found on disk. The .directory attribute will be the path to
+            the directory that could not be found.
+
+    :return:
+        A two-element tuple.
+
+        If no setting was found, the return value will be:
+
+         - [0] None
+         - [1] None
+
+        If a setting was found, the return value will be:
+
+         - [0] The setting value
+         - [1] The source of the setting, a unicode string:
+           - "project file (os-specific)"
+           - "golang.sublime-settings (os-specific)"
+           - "project file"
+           - "golang.sublime-settings"
+           - A unicode string of the path to the user's login shell
+
+        The second element of the tuple is intended to be used in the display
+        of debugging information to end users.
+    """
+
+    _require_unicode('setting_name', setting_name)
+    _check_view_window(view, window)
+
+    return _setting_value(setting_name, _settings_index(view, window))
 
 
 def executable_path(executable_name, view=None, window=None):
@@ -376,6 +1408,9 @@ def executable_path(executable_name, view=None, window=None):
     Uses the user's Sublime Text settings and then PATH environment variable
     as set by their login shell to find a go executable
 
+    Results are cached for each PATH value, so repeated lookups only need to
+    stat the previously found executable to ensure it is unchanged.
+
     :param name:
         The name of the binary to find - a unicode string of "go", "gofmt" or
         "godoc"
@@ -419,68 +1454,55 @@ def executable_path(executable_name, view=None, window=None):
     _require_unicode('executable_name', executable_name)
     _check_view_window(view, window)
 
-    executable_suffix = '.exe' if sys.platform == 'win32' else ''
-    suffixed_name = executable_name + executable_suffix
+    return _executable_path(executable_name, _settings_index(view, window))
 
-    setting, source = _get_most_specific_setting('PATH', view, window)
-    if setting is not _NO_VALUE:
-        is_str = isinstance(setting, str_cls)
-        if not is_str:
-            if debug_enabled():
-                _debug_unicode_string('PATH', setting, source)
-        else:
-            for dir_ in setting.split(os.pathsep):
-                possible_executable_path = os.path.join(dir_, suffixed_name)
-                if _check_executable(possible_executable_path, source, setting):
-                    return (possible_executable_path, source)
 
-            if debug_enabled():
-                print(
-                    'golangconfig: binary %s not found in PATH from %s - "%s"' %
-                    (
-                        executable_name,
-                        source,
-                        setting
-                    )
-                )
+def executable_paths(executable_names, view=None, window=None):
+    """
+    Locates multiple go executables using a single pass over the directories
+    from the user's Sublime Text settings and then the PATH environment
+    variable as set by their login shell. Each directory is listed once, rather
+    than being checked once for every executable.
 
-    shell, path_dirs = shellenv.get_path()
-    for dir_ in path_dirs:
-        possible_executable_path = os.path.join(dir_, suffixed_name)
-        if _check_executable(possible_executable_path, shell, os.pathsep.join(path_dirs)):
-            return (possible_executable_path, shell)
+    :param executable_names:
+        A list of unicode strings of the binaries to find, e.g. "go", "gofmt"
+        and "godoc"
 
-    if debug_enabled():
-        print(
-            'golangconfig: binary %s not found in PATH from %s - "%s"' %
-            (
-                executable_name,
-                shell,
-                os.pathsep.join(path_dirs)
-            )
-        )
+    :param view:
+        A sublime.View object to use in finding project-specific settings. This
+        should be passed whenever available.
 
-    return (None, None)
+    :param window:
+        A sublime.Window object to use in finding project-specific settings.
+        This should be passed whenever available.
 
+    :raises:
+        RuntimeError
+            When the function is called from any thread but the UI thread
+        TypeError
+            When any of the parameters are of the wrong type
 
-def _get_most_specific_setting(name, view, window):
+    :return:
+        A dict with the unicode string keys of executable_names. Each value is
+        a two-element tuple in the format returned by executable_path().
     """
-    Looks up a setting in the following order:
 
-    1. View settings, looking inside of the "osx", "windows" or "linux" key
-       based on the OS that Sublime Text is running on. These settings are from
-       a project file.
-    2. Window settings (ST3 only), looking inside of the "osx", "windows" or
-       "linux" key based on the OS that Sublime Text is running on. These
-       settings are from a project file.
-    3. golang.sublime-settings, looking inside of the "osx", "windows" or
-       "linux" key based on the OS that Sublime Text is running on.
-    4. The view settings. These settings are from a project file.
-    5. The window settings (ST3 only). These settings are from a project file.
-    6. golang.sublime-settings
+    if not isinstance(executable_names, (list, tuple)):
+        raise TypeError('executable_names must be a list, not %s' % _type_name(executable_names))
+    for executable_name in executable_names:
+        _require_unicode('executable_name', executable_name)
+    _check_view_window(view, window)
 
-    :param name:
-        A unicode string of the setting to fetch
+    return _executable_paths(executable_names, _settings_index(view, window))
+
+
+def toolchains(view=None, window=None):
+    """
+    Finds the Go installations available to the user, from the GOROOT
+    setting, the go executable in the PATH and the directories Go is commonly
+    installed in, such as ~/sdk/go1.20. Each installation is remembered, so
+    switching between projects that use different GOROOT and PATH settings
+    does not require the bin directory of each to be checked again.
 
     :param view:
         A sublime.View object to use in finding project-specific settings. This
@@ -490,70 +1512,1413 @@ def _get_most_specific_setting(name, view, window):
         A sublime.Window object to use in finding project-specific settings.
         This should be passed whenever available.
 
+    :raises:
+        RuntimeError
+            When the function is called from any thread but the UI thread
+        TypeError
+            When any of the parameters are of the wrong type
+
     :return:
-        A two-element tuple.
+        A list of dicts, one for each installation, with the keys:
 
-        If no setting was found, the return value will be:
+         - "goroot" - a unicode string of the path to the installation
+         - "version" - None or a unicode string of the version, e.g. "go1.20.5"
+         - "executables" - a sorted list of unicode strings of the names of
+           the executables in the bin directory
 
-         - [0] golangconfig._NO_VALUE
-         - [1] None
+        The installation from the GOROOT setting is first, followed by the one
+        containing the go executable in the PATH.
+    """
 
-        If a setting was found, the return value will be:
+    _check_view_window(view, window)
 
-         - [0] The setting value
-         - [1] A unicode string of the source:
-           - "project file (os-specific)"
-           - "golang.sublime-settings (os-specific)"
-           - "project file"
-           - "golang.sublime-settings"
+    output = []
+    for goroot, (version, names) in _find_toolchains(_settings_index(view, window)):
+        output.append({
+            'goroot': goroot,
+            'version': version,
+            'executables': sorted(names),
+        })
+    return output
+
+
+@_profiled('setting_value')
+def _setting_value(setting_name, settings):
+    """
+    Looks up the value of a setting, falling back to the user's shell
+    environment. Implements setting_value().
+
+    :param setting_name:
+        A unicode string of the setting to retrieve
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :raises:
+        golangconfig.GoPathNotFoundError
+            When one or more directories specified by the GOPATH environment
+            variable could not be found on disk
+        golangconfig.GoRootNotFoundError
+            When the directory specified by GOROOT environment variable could
+            not be found on disk
+
+    :return:
+        A two-element tuple, as returned by setting_value()
+    """
+
+    setting, source = settings.get(setting_name)
+
+    if setting == _NO_VALUE:
+        setting = None
+        source = None
+
+        shell, env = _shell_env()
+        if setting_name in env:
+            source = shell
+            setting = env[setting_name]
+        elif setting_name in _GO_ENV_VARS and settings.go_env:
+            setting = _go_env(settings).get(setting_name)
+            if setting is not None:
+                source = 'go env'
+
+    if setting_name not in set(['GOPATH', 'GOROOT']):
+        return (setting, source)
+
+    if setting is None and source is None:
+        return (setting, source)
+
+    # We add some extra processing here for known settings to improve the
+    # user experience, especially around debugging
+    _debug_unicode_string(setting_name, setting, source)
+
+    if not isinstance(setting, str_cls):
+        setting = str_cls(setting)
+
+    # Go creates its default GOPATH the first time it is needed
+    if source == 'go env':
+        return (setting, source)
+
+    if setting_name == 'GOROOT':
+        if _dir_exists(setting):
+            return (setting, source)
+
+    has_multiple = False
+    if setting_name == 'GOPATH':
+        values = setting.split(os.pathsep)
+        has_multiple = len(values) > 1
+        missing = []
+
+        for value in values:
+            if not _dir_exists(value):
+                missing.append(value)
+
+        if not missing:
+            return (setting, source)
+
+    if _event_callbacks:
+        directories = [setting] if setting_name == 'GOROOT' else missing
+        _emit('path_not_found', {'name': setting_name, 'directories': directories})
+
+    if setting_name == 'GOROOT':
+        message = 'The GOROOT environment variable value "%s" does not exist on the filesystem'
+        e = GoRootNotFoundError(message % setting)
+        e.directory = setting
+        raise e
+
+    if not has_multiple:
+        suffix = 'value "%s" does not exist on the filesystem' % missing[0]
+    elif len(missing) == 1:
+        suffix = 'contains the directory "%s" that does not exist on the filesystem' % missing[0]
+    else:
+        paths = ', '.join('"' + path + '"' for path in missing)
+        suffix = 'contains %s directories that do not exist on the filesystem: %s' % (len(missing), paths)
+
+    message = 'The GOPATH environment variable ' + suffix
+    e = GoPathNotFoundError(message)
+    e.directories = missing
+    raise e
+
+
+def _executable_path(executable_name, settings):
+    """
+    Finds an executable via the PATH setting and then the PATH environment
+    variable from the user's login shell. Implements executable_path().
+
+    :param executable_name:
+        A unicode string of the binary to find, e.g. "go"
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :return:
+        A two-element tuple, as returned by executable_path()
+    """
+
+    path, source, _ = _locate_executable(executable_name, settings)
+    return (path, source)
+
+
+@_profiled('executable_path')
+def _locate_executable(executable_name, settings):
+    """
+    Finds an executable, recording the directories searched when it could not
+    be found. Implements _executable_path().
+
+    :param executable_name:
+        A unicode string of the binary to find, e.g. "go"
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :return:
+        A three-element tuple:
+
+         - [0] None or a unicode string of the path to the executable
+         - [1] None or a unicode string of the source of the PATH value
+         - [2] None if the executable was found, otherwise a list as returned
+               by _search_trace()
+    """
+
+    executable_suffix = '.exe' if sys.platform == 'win32' else ''
+    suffixed_name = executable_name + executable_suffix
+
+    setting, source = settings.get('PATH')
+    is_str = isinstance(setting, str_cls)
+
+    cache_key = (suffixed_name, setting if is_str else None, source)
+    cached = _cached_executable(cache_key)
+    if cached is not None:
+        if _event_callbacks:
+            _emit('executable_cache_hit', {'name': executable_name, 'path': cached[0], 'source': cached[1]})
+        return cached + (None,)
+    trace = _cached_missing(cache_key)
+    if trace is not None:
+        if _event_callbacks:
+            _emit('executable_not_found', {'name': executable_name, 'cached': True})
+        return (None, None, trace)
+    if _event_callbacks:
+        _emit('executable_cache_miss', {'name': executable_name})
+
+    use_index = settings.path_index
+    parallel = settings.parallel_path
+    debug = settings.debug
+    # Directories that _probe_dirs() did not get a response from
+    skipped = set()
+    started = time.time()
+
+    if setting is not _NO_VALUE:
+        if not is_str:
+            if debug:
+                _debug_unicode_string('PATH', setting, source)
+        else:
+            possible_executable_path, dirs = _selected_toolchain(settings, setting.split(os.pathsep), suffixed_name)
+            if possible_executable_path is None:
+                possible_executable_path = _find_in_dirs(
+                    dirs,
+                    suffixed_name,
+                    source,
+                    setting,
+                    use_index,
+                    parallel,
+                    skipped,
+                    debug
+                )
+            if possible_executable_path is not None:
+                if not _skipped_dir(setting.split(os.pathsep), possible_executable_path, skipped):
+                    _cache_executable(cache_key, possible_executable_path, source, None)
+                if _event_callbacks:
+                    _emit(
+                        'executable_found',
+                        {'name': executable_name, 'path': possible_executable_path, 'source': source}
+                    )
+                return (possible_executable_path, source, None)
+
+            if debug:
+                print(
+                    'golangconfig: binary %s not found in PATH from %s - "%s"' %
+                    (
+                        executable_name,
+                        source,
+                        setting
+                    )
+                )
+
+    shell, path_dirs = _shell_path()
+    shell_path = os.pathsep.join(path_dirs)
+    possible_executable_path = None
+    dirs = path_dirs
+    if not is_str or setting is _NO_VALUE:
+        possible_executable_path, dirs = _selected_toolchain(settings, path_dirs, suffixed_name)
+    if possible_executable_path is None:
+        possible_executable_path = _find_in_dirs(
+            dirs,
+            suffixed_name,
+            shell,
+            shell_path,
+            use_index,
+            parallel,
+            skipped,
+            debug
+        )
+    if possible_executable_path is not None:
+        searched_dirs = list(path_dirs)
+        if is_str and setting is not _NO_VALUE:
+            searched_dirs = setting.split(os.pathsep) + searched_dirs
+        if not _skipped_dir(searched_dirs, possible_executable_path, skipped):
+            _cache_executable(cache_key, possible_executable_path, shell, shell_path)
+        if _event_callbacks:
+            _emit('executable_found', {'name': executable_name, 'path': possible_executable_path, 'source': shell})
+        return (possible_executable_path, shell, None)
+
+    if debug:
+        print(
+            'golangconfig: binary %s not found in PATH from %s - "%s"' %
+            (
+                executable_name,
+                shell,
+                shell_path
+            )
+        )
+
+    trace = _search_trace(setting if is_str and setting is not _NO_VALUE else None, source, path_dirs, shell)
+    _cache_missing(cache_key, trace, shell_path, skipped, started)
+
+    if _event_callbacks:
+        _emit('executable_not_found', {'name': executable_name, 'cached': False})
+    return (None, None, trace)
+
+
+@_profiled('executable_paths')
+def _executable_paths(executable_names, settings):
+    """
+    Finds multiple executables with a single listing of each PATH directory.
+    Implements executable_paths().
+
+    :param executable_names:
+        A list of unicode strings of the binaries to find
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :return:
+        A dict, as returned by executable_paths()
+    """
+
+    executable_suffix = '.exe' if sys.platform == 'win32' else ''
+
+    setting, source = settings.get('PATH')
+    is_str = isinstance(setting, str_cls)
+
+    results = {}
+    # Keys are the names to match against directory entries, values are a
+    # two-element tuple of the executable name and cache key
+    pending = {}
+    for executable_name in executable_names:
+        suffixed_name = executable_name + executable_suffix
+        cache_key = (suffixed_name, setting if is_str else None, source)
+        cached = _cached_executable(cache_key)
+        if cached is not None:
+            if _event_callbacks:
+                _emit('executable_cache_hit', {'name': executable_name, 'path': cached[0], 'source': cached[1]})
+            results[executable_name] = cached
+            continue
+        if _cached_missing(cache_key) is not None:
+            if _event_callbacks:
+                _emit('executable_not_found', {'name': executable_name, 'cached': True})
+            results[executable_name] = (None, None)
+            continue
+        if _event_callbacks:
+            _emit('executable_cache_miss', {'name': executable_name})
+        match_name = suffixed_name.lower() if sys.platform == 'win32' else suffixed_name
+        pending[match_name] = (executable_name, cache_key)
+
+    use_index = settings.path_index
+    debug = settings.debug
+    started = time.time()
+
+    def search(dirs, dirs_source, dirs_setting, shell_path):
+        for dir_ in dirs:
+            if not pending:
+                return
+            names = _indexed_dir(dir_) if use_index else _list_dir(dir_)
+            for match_name in names & set(pending.keys()):
+                executable_name, cache_key = pending[match_name]
+                possible_executable_path = os.path.join(dir_, executable_name + executable_suffix)
+                if _check_executable(possible_executable_path, dirs_source, dirs_setting, debug):
+                    _cache_executable(cache_key, possible_executable_path, dirs_source, shell_path)
+                    results[executable_name] = (possible_executable_path, dirs_source)
+                    del pending[match_name]
+                    if _event_callbacks:
+                        _emit(
+                            'executable_found',
+                            {'name': executable_name, 'path': possible_executable_path, 'source': dirs_source}
+                        )
+
+    if pending and setting is not _NO_VALUE:
+        if not is_str:
+            if debug:
+                _debug_unicode_string('PATH', setting, source)
+        else:
+            search(setting.split(os.pathsep), source, setting, None)
+
+    if pending:
+        shell, path_dirs = _shell_path()
+        shell_path = os.pathsep.join(path_dirs)
+        search(path_dirs, shell, shell_path, shell_path)
+
+    if pending:
+        trace = _search_trace(setting if is_str and setting is not _NO_VALUE else None, source, path_dirs, shell)
+        for executable_name, cache_key in sorted(pending.values()):
+            results[executable_name] = (None, None)
+            _cache_missing(cache_key, trace, shell_path, set(), started)
+            if _event_callbacks:
+                _emit('executable_not_found', {'name': executable_name, 'cached': False})
+            if debug:
+                print(
+                    'golangconfig: binary %s not found in PATH from %s - "%s"' %
+                    (
+                        executable_name,
+                        shell,
+                        shell_path
+                    )
+                )
+
+    return results
+
+
+@_profiled('settings')
+def _settings_index(view, window):
+    """
+    Fetches the golang settings for a view and/or window from the Sublime Text
+    API. The project data is only requested once, and the result can answer
+    any number of setting lookups without calling the API again, except for
+    the first lookup of each name in golang.sublime-settings. The result for a
+    view is kept in _view_cache until invalidate() or view_closed() is called.
+
+    :param view:
+        A sublime.View object to use in finding project-specific settings
+
+    :param window:
+        A sublime.Window object to use in finding project-specific settings
+
+    :raises:
+        RuntimeError
+            When the function is called from any thread but the UI thread
+        TypeError
+            When any of the parameters are of the wrong type
+
+    :return:
+        A _SettingsIndex object
+    """
+
+    global _profiling
+
+    # The Sublime Text API is not threadsafe in ST2, so we
+    # double check here to prevent crashes
+    if not isinstance(threading.current_thread(), threading._MainThread):
+        raise RuntimeError('golangconfig.setting_value() must be called from the main thread')
+
+    if view is not None and not isinstance(view, sublime.View):
+        raise TypeError('view must be an instance of sublime.View, not %s' % _type_name(view))
+
+    if window is not None and not isinstance(window, sublime.Window):
+        raise TypeError('window must be an instance of sublime.Window, not %s' % _type_name(window))
+
+    st_settings = sublime.load_settings('golang.sublime-settings')
+    _watch_settings(st_settings)
+    if not _state_loaded:
+        _load_state()
+
+    if view and not window:
+        window = view.window()
+
+    # The settings of a view are cached, since view settings include the
+    # project settings, and fetching them for each call is expensive. The
+    # entry is only used for the same window and project file.
+    view_key = None
+    if view:
+        project_file_name = None
+        if window and hasattr(window, 'project_file_name'):
+            project_file_name = window.project_file_name()
+        view_key = (window.id() if window else None, project_file_name)
+        cached = _view_cache.get(view.id())
+        if cached is not None and cached[0] == view_key:
+            settings = cached[1]
+            _profiling = settings.profile or settings.debug
+            return settings
+
+    view_settings = view.settings().get('golang', {}) if view else {}
+
+    window_settings = {}
+    if window:
+        project_data = _project_data(window) if sys.version_info >= (3,) else None
+        if project_data:
+            window_settings = project_data.get('settings', {}).get('golang', {})
+        elif not view and window.active_view():
+            window_settings = window.active_view().settings().get('golang', {})
+
+    settings = _SettingsIndex(view_settings, window_settings, st_settings, _st_values, _st_flags)
+    if view_key is not None:
+        _view_cache.set(view.id(), (view_key, settings))
+    _profiling = settings.profile or settings.debug
+    return settings
+
+
+def _watch_settings(st_settings):
+    """
+    Registers invalidate() to be called when golang.sublime-settings changes
+
+    :param st_settings:
+        The sublime.Settings object for golang.sublime-settings
+    """
+
+    global _settings_watched
+
+    if _settings_watched:
+        return
+    # A reload of this module leaves the callback of the previous copy in place
+    st_settings.clear_on_change('golangconfig')
+    st_settings.add_on_change('golangconfig', invalidate)
+    _settings_watched = True
+
+
+class _SettingsIndex():
+
+    """
+    The golang settings of a view, window and golang.sublime-settings, merged
+    by precedence. Settings are looked up in the following order:
+
+    1. View settings, looking inside of the "osx", "windows" or "linux" key
+       based on the OS that Sublime Text is running on. These settings are from
+       a project file.
+    2. Window settings (ST3 only), looking inside of the "osx", "windows" or
+       "linux" key based on the OS that Sublime Text is running on. These
+       settings are from a project file.
+    3. golang.sublime-settings, looking inside of the "osx", "windows" or
+       "linux" key based on the OS that Sublime Text is running on.
+    4. The view settings. These settings are from a project file.
+    5. The window settings (ST3 only). These settings are from a project file.
+    6. golang.sublime-settings
+
+    Sources 1 through 5 are dicts, so they are flattened into a single dict
+    when the object is created. The sublime.Settings object can not be
+    enumerated, so values from source 6 are remembered as they are looked up,
+    in dicts that are shared until invalidate() is called.
+    """
+
+    _merged = None
+    _st_settings = None
+    _st_values = None
+    _flags = None
+
+    def __init__(self, view_settings, window_settings, st_settings, st_values, st_flags):
+        """
+        :param view_settings:
+            A dict of the golang settings of the view
+
+        :param window_settings:
+            A dict of the golang settings of the window
+
+        :param st_settings:
+            The sublime.Settings object for golang.sublime-settings
+
+        :param st_values:
+            An _LruCache to store values looked up from st_settings in
+
+        :param st_flags:
+            An _LruCache to store boolean flags looked up from st_settings in
+        """
+
+        dict_sources = []
+        for settings_object, source in [(view_settings, 'project file'), (window_settings, 'project file')]:
+            if isinstance(settings_object, dict):
+                dict_sources.append((settings_object, source))
+
+        platform_sources = []
+        for settings_object, source in dict_sources + [(st_settings, 'golang.sublime-settings')]:
+            platform_settings = settings_object.get(_platform, _NO_VALUE)
+            if isinstance(platform_settings, dict):
+                platform_sources.append((platform_settings, source + ' (os-specific)'))
+
+        self._merged = {}
+        for settings_dict, source in reversed(platform_sources + dict_sources):
+            for name, value in settings_dict.items():
+                self._merged[name] = (value, source)
+
+        self._st_settings = st_settings
+        self._st_values = st_values
+        self._flags = st_flags
+
+    def get(self, name):
+        """
+        Looks up a setting
+
+        :param name:
+            A unicode string of the setting to fetch
+
+        :return:
+            A two-element tuple.
+
+            If no setting was found, the return value will be:
+
+             - [0] golangconfig._NO_VALUE
+             - [1] None
+
+            If a setting was found, the return value will be:
+
+             - [0] The setting value
+             - [1] A unicode string of the source:
+               - "project file (os-specific)"
+               - "golang.sublime-settings (os-specific)"
+               - "project file"
+               - "golang.sublime-settings"
+        """
+
+        if name in self._merged:
+            return self._merged[name]
+
+        output = self._st_values.get(name)
+        if output is None:
+            value = self._st_settings.get(name, _NO_VALUE)
+            if value == _NO_VALUE:
+                output = (_NO_VALUE, None)
+            else:
+                output = (value, 'golang.sublime-settings')
+            self._st_values.set(name, output)
+        return output
+
+    def freeze(self, names):
+        """
+        Copies the values of settings into a SettingsSnapshot object that can
+        be used from any thread
+
+        :param names:
+            A list of unicode strings of the settings to copy
+
+        :return:
+            A golangconfig.SettingsSnapshot object
+        """
+
+        values = {}
+        for name in names:
+            values[name] = self.get(name)
+        flags = {}
+        for name in _FLAG_NAMES:
+            flags[name] = self._global_flag(name)
+        return SettingsSnapshot(values, flags, _generation)
+
+    def _global_flag(self, name):
+        """
+        :param name:
+            A unicode string of a boolean setting from golang.sublime-settings
+
+        :return:
+            A boolean of the setting value
+        """
+
+        output = self._flags.get(name)
+        if output is None:
+            value = self._st_settings.get(name)
+            output = False if value == '0' else bool(value)
+            self._flags.set(name, output)
+        return output
+
+    @property
+    def debug(self):
+        """
+        A boolean - if the "debug" setting is enabled
+        """
+
+        return self._global_flag('debug')
+
+    @property
+    def path_index(self):
+        """
+        A boolean - if the "path_index" setting is enabled, in which case the
+        directories in the PATH are searched using the listings in _dir_index
+        """
+
+        return self._global_flag('path_index')
+
+    @property
+    def profile(self):
+        """
+        A boolean - if the "profile" setting is enabled, in which case timing
+        information is recorded for stats()
+        """
+
+        return self._global_flag('profile')
+
+    @property
+    def parallel_path(self):
+        """
+        A boolean - if the "parallel_path" setting is enabled, in which case
+        the directories in the PATH are checked concurrently
+        """
+
+        return self._global_flag('parallel_path')
+
+    @property
+    def go_env(self):
+        """
+        A boolean - if the "go_env" setting is enabled, in which case
+        GOROOT, GOPATH, GOMODCACHE and GOCACHE fall back to the output of
+        "go env -json"
+        """
+
+        return self._global_flag('go_env')
+
+
+class SettingsSnapshot():
+
+    """
+    A plain-data copy of settings, created by settings_snapshot(), that may be
+    used from any thread
+    """
+
+    _values = None
+    _flags = None
+    _generation = None
+
+    def __init__(self, values, flags, generation):
+        """
+        :param values:
+            A dict with unicode string keys of setting names and values of
+            two-element tuples, as returned by _SettingsIndex.get()
+
+        :param flags:
+            A dict with unicode string keys from _FLAG_NAMES and boolean values
+
+        :param generation:
+            An integer of the value of generation() when the snapshot was
+            created
+        """
+
+        self._values = values
+        self._flags = flags
+        self._generation = generation
+
+    @property
+    def setting_names(self):
+        """
+        A sorted list of unicode strings of the settings in the snapshot
+        """
+
+        return sorted(self._values.keys())
+
+    def is_current(self):
+        """
+        Checks if invalidate() has been called since the snapshot was created,
+        meaning that the snapshot may no longer reflect the user's settings
+
+        :return:
+            A boolean - if the snapshot is still current
+        """
+
+        return self._generation == _generation
+
+    def get(self, name):
+        """
+        Looks up a setting captured in the snapshot
+
+        :param name:
+            A unicode string of the setting to fetch
+
+        :raises:
+            ValueError
+                When the setting was not captured in the snapshot
+
+        :return:
+            A two-element tuple, as returned by _SettingsIndex.get()
+        """
+
+        if name not in self._values:
+            raise ValueError('The setting "%s" is not part of the snapshot' % name)
+        return self._values[name]
+
+    @property
+    def debug(self):
+        """
+        A boolean - if the "debug" setting is enabled
+        """
+
+        return self._flags['debug']
+
+    @property
+    def path_index(self):
+        """
+        A boolean - if the "path_index" setting is enabled
+        """
+
+        return self._flags['path_index']
+
+    @property
+    def profile(self):
+        """
+        A boolean - if the "profile" setting is enabled
+        """
+
+        return self._flags['profile']
+
+    @property
+    def parallel_path(self):
+        """
+        A boolean - if the "parallel_path" setting is enabled
+        """
+
+        return self._flags['parallel_path']
+
+    @property
+    def go_env(self):
+        """
+        A boolean - if the "go_env" setting is enabled
+        """
+
+        return self._flags['go_env']
+
+
+@_profiled('subprocess_info')
+def _subprocess_info(executable_name, required_vars, optional_vars, settings):
+    """
+    Locates an executable and builds the env dict to run it with. Implements
+    subprocess_info() and subprocess_info_from_snapshot().
+
+    :param executable_name:
+        A unicode string of the executable to locate, e.g. "go" or "gofmt"
+
+    :param required_vars:
+        A list of unicode strings of the required environment variables
+
+    :param optional_vars:
+        None or a list of unicode strings of the optional environment variables
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :return:
+        A two-element tuple, as returned by subprocess_info()
+    """
+
+    path, _ = _require_executable(executable_name, settings)
+    path = _path_encode(path)
+
+    env, _ = _build_env(required_vars, optional_vars, settings)
+    _check_goroot_executable(executable_name, path, env)
+
+    return (path, env)
+
+
+class _WorkerPool():
+
+    """
+    A fixed number of daemon threads that run functions submitted from any
+    thread. Threads are only started once work is submitted.
+    """
+
+    _size = None
+    _name = None
+    _queue = None
+    _threads = None
+    _idle = None
+    _lock = None
+
+    def __init__(self, size, name):
+        """
+        :param size:
+            An integer of the maximum number of threads to start
+
+        :param name:
+            A unicode string to include in the names of the threads
+        """
+
+        self._size = size
+        self._name = name
+        self._queue = queue.Queue()
+        self._threads = []
+        self._idle = 0
+        self._lock = threading.Lock()
+
+    def submit(self, func):
+        """
+        Queues a function to be run by one of the threads
+
+        :param func:
+            A callable that accepts no parameters
+        """
+
+        with self._lock:
+            if self._idle == 0 and len(self._threads) < self._size:
+                thread_name = 'golangconfig-%s-%d' % (self._name, len(self._threads))
+                thread = threading.Thread(target=self._run, name=thread_name)
+                thread.daemon = True
+                self._threads.append(thread)
+                thread.start()
+            else:
+                self._idle -= 1
+        self._queue.put(func)
+
+    def _run(self):
+        """
+        The main loop of each thread
+        """
+
+        while True:
+            func = self._queue.get()
+            try:
+                func()
+            except (Exception):
+                traceback.print_exc()
+            with self._lock:
+                self._idle += 1
+
+
+# The threads used by subprocess_info_async()
+_worker_pool = _WorkerPool(4, 'worker')
+
+# The threads used by _probe_dirs(). These are separate from _worker_pool
+# since the work of subprocess_info_async() waits on them.
+_probe_pool = _WorkerPool(8, 'probe')
+
+
+def _require_executable(executable_name, settings):
+    """
+    Locates an executable via _locate_executable(), raising an exception if it
+    could not be found
+
+    :param executable_name:
+        A unicode string of the executable to locate, e.g. "go" or "gofmt"
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :raises:
+        golangconfig.ExecutableError
+            When the executable could not be located
+
+    :return:
+        A two-element tuple of the unicode string path to the executable and
+        the unicode string source of the PATH value
+    """
+
+    path, source, trace = _locate_executable(executable_name, settings)
+    if path is not None:
+        return (path, source)
+
+    name = executable_name
+    if sys.platform == 'win32':
+        name += '.exe'
+    dirs = [dir_ for dir_, _ in trace]
+    exception = ExecutableError(
+        'The executable "%s" could not be located in any of the following locations: "%s"' %
+        (
+            name,
+            '", "'.join(dirs)
+        )
+    )
+    exception.name = name
+    exception.dirs = dirs
+    raise exception
+
+
+@_profiled('build_env')
+def _build_env(required_vars, optional_vars, settings):
+    """
+    Constructs the env dict for subprocess.Popen() from the user's shell
+    environment and the values of the requested variables from setting_value()
+
+    :param required_vars:
+        A list of unicode strings of the required environment variables
+
+    :param optional_vars:
+        None or a list of unicode strings of the optional environment variables
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :raises:
+        TypeError
+            When any of the variable names are not unicode strings
+        golangconfig.EnvVarError
+            When one or more required_vars are not available
+        golangconfig.GoPathNotFoundError
+            When one or more directories from GOPATH could not be found on disk
+        golangconfig.GoRootNotFoundError
+            When the GOROOT directory could not be found on disk
+
+    :return:
+        A two-element tuple.
+
+         - [0] A dict to pass to the env parameter of subprocess.Popen()
+         - [1] A dict with unicode string keys of the variable names and
+               values of the two-element tuples from setting_value()
+    """
+
+    var_groups = [required_vars]
+    if optional_vars:
+        var_groups.append(optional_vars)
+
+    missing_vars = []
+    var_values = {}
+    overlay = []
+
+    for var_names in var_groups:
+        for var_name in var_names:
+            _require_unicode('setting_name', var_name)
+            value, source = _setting_value(var_name, settings)
+            var_values[var_name] = (value, source)
+
+            if value is not None:
+                if not isinstance(value, str_cls):
+                    value = str_cls(value)
+                value = _env_encode(value)
+            overlay.append((_env_encode(var_name), value))
+
+    env = _overlay_env(tuple(overlay))
+
+    for required_var in required_vars:
+        var_key = _env_encode(required_var)
+        if var_key not in env:
+            missing_vars.append(required_var)
+
+    if _event_callbacks:
+        _emit(
+            'env_built',
+            {
+                'required_vars': list(required_vars),
+                'optional_vars': list(optional_vars or []),
+                'missing_vars': list(missing_vars)
+            }
+        )
+
+    if missing_vars:
+        missing_vars = sorted(missing_vars, key=lambda s: s.lower())
+        exception = EnvVarError(
+            'The following environment variable%s currently unset: %s' %
+            (
+                's are' if len(missing_vars) > 1 else ' is',
+                ', '.join(missing_vars)
+            )
+        )
+        exception.missing = missing_vars
+        raise exception
+
+    return (env, var_values)
+
+
+def _env_encode(value):
+    """
+    Encodes an environment variable name or value for use with
+    subprocess.Popen(), remembering the result in _encode_cache on Python 2,
+    where encoding is necessary
+
+    :param value:
+        A unicode string
+
+    :return:
+        The value as returned by shellenv.env_encode()
+    """
+
+    if not py2:
+        return shellenv.env_encode(value)
+
+    cache_key = ('env', value)
+    encoded = _encode_cache.get(cache_key)
+    if encoded is None:
+        encoded = shellenv.env_encode(value)
+        _encode_cache.set(cache_key, encoded)
+    return encoded
+
+
+def _path_encode(value):
+    """
+    Encodes a filesystem path for use with subprocess.Popen(), remembering the
+    result in _encode_cache on Python 2, where encoding is necessary
+
+    :param value:
+        A unicode string of the path
+
+    :return:
+        The value as returned by shellenv.path_encode()
+    """
+
+    if not py2:
+        return shellenv.path_encode(value)
+
+    cache_key = ('path', value)
+    encoded = _encode_cache.get(cache_key)
+    if encoded is None:
+        encoded = shellenv.path_encode(value)
+        _encode_cache.set(cache_key, encoded)
+    return encoded
+
+
+def _overlay_env(overlay):
+    """
+    Returns the env dict from the user's login shell with the values from
+    settings applied. The result for each distinct overlay is stored in
+    _env_cache, so the env only needs to be rebuilt when the settings change.
+
+    :param overlay:
+        A tuple of two-element tuples. The first element is the encoded name
+        of an environment variable, and the second is the encoded value, or
+        None if the variable should be removed.
+
+    :return:
+        A new dict to pass to the env parameter of subprocess.Popen()
+    """
+
+    env = _env_cache.get(overlay)
+    if _event_callbacks:
+        _emit('env_cache_miss' if env is None else 'env_cache_hit', {})
+    if env is None:
+        base_env = _env_cache.get(())
+        if base_env is None:
+            _, base_env = _shell_env(for_subprocess=True)
+            base_env = dict(base_env)
+
+        _env_cache.set((), base_env)
+
+        env = dict(base_env)
+        for var_key, value in overlay:
+            if value is None:
+                env.pop(var_key, None)
+            else:
+                env[var_key] = value
+        _env_cache.set(overlay, env)
+
+    return dict(env)
+
+
+def _go_env(settings):
+    """
+    Fetches the default values of the go toolchain, running "go env -json"
+    only if the go executable has not been run before, or has changed. If
+    running go failed, it is tried again once the backoff in _go_env_cache has
+    passed.
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :return:
+        A dict with unicode string keys and values of the variables that are
+        in _GO_ENV_VARS and not empty. An empty dict if go could not be found
+        or the output could not be parsed.
+    """
+
+    path, _ = _executable_path('go', settings)
+    if path is None:
+        return {}
+
+    signature = _stat_signature(path)
+    cached = _go_env_cache.get(path)
+    if cached is not None and cached[0] != signature:
+        cached = None
+    if cached is not None and (cached[2] is None or cached[2] > time.time()):
+        return cached[1]
+
+    values = _run_go_env(path, settings.debug)
+    if values is None:
+        if cached is None:
+            backoff = _MISSING_MIN_BACKOFF
+        else:
+            backoff = min(cached[3] * 2, _MISSING_MAX_BACKOFF)
+        _go_env_cache.set(path, (signature, {}, time.time() + backoff, backoff))
+        return {}
+
+    _go_env_cache.set(path, (signature, values, None, None))
+    return values
+
+
+@_profiled('toolchains')
+def _find_toolchains(settings):
+    """
+    Looks for Go installations via the GOROOT setting, the go executable in the
+    PATH and _TOOLCHAIN_DIRS, adding each one found to _toolchains
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :return:
+        A list of two-element tuples of the unicode string GOROOT of each
+        installation, without duplicates, and the tuple returned by
+        _toolchain()
+    """
+
+    candidates = []
+    try:
+        goroot, _ = _setting_value('GOROOT', settings)
+        if isinstance(goroot, str_cls):
+            candidates.append(goroot)
+    except (GoRootNotFoundError):
+        pass
+
+    go_path, _ = _executable_path('go', settings)
+    if go_path is not None:
+        bin_dir = os.path.dirname(_fs(os.path.realpath, go_path))
+        if os.path.basename(bin_dir) == 'bin':
+            candidates.append(os.path.dirname(bin_dir))
+
+    for pattern in _TOOLCHAIN_DIRS:
+        candidates.extend(sorted(_fs(glob.glob, os.path.expanduser(pattern))))
+
+    output = []
+    seen = set()
+    for goroot in candidates:
+        goroot = os.path.normpath(goroot)
+        if goroot in seen:
+            continue
+        seen.add(goroot)
+        toolchain = _toolchain(goroot)
+        if toolchain is not None:
+            output.append((goroot, toolchain))
+    return output
+
+
+def _selected_toolchain(settings, dirs, suffixed_name):
+    """
+    Looks up an executable in the Go installation selected by the GOROOT
+    setting, so that a project pinned to an installation found by
+    toolchains() is resolved with a single lookup in _toolchains rather than
+    a walk of the PATH. The installation is only used when its bin directory
+    is the first directory to be searched, since an executable in it then
+    takes precedence over the rest of the PATH.
+
+    :param settings:
+        A _SettingsIndex or SettingsSnapshot object of the settings for the
+        view/window
+
+    :param dirs:
+        A list of unicode strings of the directories to search, in order
+
+    :param suffixed_name:
+        A unicode string of the executable name, including ".exe" on Windows
+
+    :return:
+        A two-element tuple of None or a unicode string of the path to the
+        executable, and a list of unicode strings of the directories that
+        still need to be searched
+    """
+
+    if not dirs:
+        return (None, dirs)
+
+    try:
+        goroot, _ = settings.get('GOROOT')
+    except (ValueError):
+        # A SettingsSnapshot does not include GOROOT unless it was requested
+        return (None, dirs)
+    if not isinstance(goroot, str_cls) or goroot == _NO_VALUE:
+        return (None, dirs)
+
+    goroot = os.path.normpath(goroot)
+    if goroot not in _toolchains or os.path.normpath(dirs[0]) != os.path.join(goroot, 'bin'):
+        return (None, dirs)
+
+    toolchain = _toolchain(goroot)
+    if toolchain is None:
+        return (None, dirs)
+    match_name = suffixed_name.lower() if sys.platform == 'win32' else suffixed_name
+    if match_name in toolchain[1]:
+        return (os.path.join(dirs[0], suffixed_name), [])
+    return (None, dirs[1:])
+
+
+def _toolchain(goroot):
+    """
+    Fetches the details of the Go installation at a GOROOT from _toolchains,
+    listing the bin directory again only if its modification time has changed
+
+    :param goroot:
+        A unicode string of the path to the installation
+
+    :return:
+        None if goroot does not contain a go executable, otherwise a
+        two-element tuple of None or a unicode string of the version, and a
+        set of unicode strings of the names of the executables in the bin
+        directory
+    """
+
+    bin_dir = os.path.join(goroot, 'bin')
+    try:
+        mtime = _fs(os.stat, bin_dir).st_mtime
+    except (OSError):
+        _toolchains.pop(goroot)
+        return None
+
+    cached = _toolchains.get(goroot)
+    if cached is not None and cached[0] == mtime:
+        return cached[1:]
+
+    names = set()
+    for name in _list_dir(bin_dir):
+        path = os.path.join(bin_dir, name)
+        if _fs(os.path.isfile, path) and _fs(os.access, path, os.X_OK):
+            names.add(name)
+    if ('go.exe' if sys.platform == 'win32' else 'go') not in names:
+        _toolchains.pop(goroot)
+        return None
+
+    version = None
+    try:
+        with _fs(open, os.path.join(goroot, 'VERSION'), 'rb') as f:
+            version = f.readline().decode('utf-8').strip() or None
+    except (IOError, OSError, ValueError):
+        pass
+
+    # As with _dir_index, a recently-modified directory may change again
+    # without its modification time changing
+    if time.time() - mtime >= _DIR_INDEX_MIN_AGE:
+        _toolchains.set(goroot, (mtime, version, names))
+    else:
+        _toolchains.pop(goroot)
+    return (version, names)
+
+
+@_profiled('go_env')
+def _run_go_env(path, debug):
+    """
+    Runs "go env -json" in the user's shell environment. On Sublime Text 3 the
+    process is killed if it runs for longer than _GO_ENV_TIMEOUT. On Sublime
+    Text 2 this blocks until go exits.
+
+    :param path:
+        A unicode string of the path to the go executable
+
+    :param debug:
+        A boolean - if debug information should be printed
+
+    :return:
+        None if go could not be run, did not finish in time or its output
+        could not be parsed, otherwise a dict as returned by _go_env()
+    """
+
+    startupinfo = None
+    if sys.platform == 'win32':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+    try:
+        _, env = _shell_env(for_subprocess=True)
+        proc = subprocess.Popen(
+            [_path_encode(path), _path_encode('env'), _path_encode('-json')],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            startupinfo=startupinfo
+        )
+        if sys.version_info >= (3,):
+            try:
+                stdout, _ = proc.communicate(timeout=_GO_ENV_TIMEOUT)
+            except (subprocess.TimeoutExpired):
+                proc.kill()
+                proc.communicate()
+                if debug:
+                    print('golangconfig: "%s env -json" did not finish within %s seconds' % (path, _GO_ENV_TIMEOUT))
+                return None
+        else:
+            stdout, _ = proc.communicate()
+        data = json.loads(stdout.decode('utf-8'))
+    except (OSError, ValueError):
+        if debug:
+            print('golangconfig: unable to run "%s env -json"' % path)
+        return None
+
+    values = {}
+    if isinstance(data, dict):
+        for name in _GO_ENV_VARS:
+            value = data.get(name)
+            if value and isinstance(value, str_cls):
+                values[name] = value
+    return values
+
+
+@_profiled('shellenv')
+def _shell_env(for_subprocess=False):
+    """
+    Fetches the environment of the user's login shell via shellenv.get_env()
+
+    :param for_subprocess:
+        If the env should be encoded for use with subprocess.Popen()
+
+    :return:
+        A two-element tuple of the shell and env dict, as returned by
+        shellenv.get_env()
+    """
+
+    return shellenv.get_env(for_subprocess=for_subprocess)
+
+
+@_profiled('shellenv')
+def _shell_path():
+    """
+    Fetches the PATH of the user's login shell via shellenv.get_path()
+
+    :return:
+        A two-element tuple of the shell and a list of unicode string
+        directories, as returned by shellenv.get_path()
     """
 
-    # The Sublime Text API is not threadsafe in ST2, so we
-    # double check here to prevent crashes
-    if not isinstance(threading.current_thread(), threading._MainThread):
-        raise RuntimeError('golangconfig.setting_value() must be called from the main thread')
+    return shellenv.get_path()
 
-    if view is not None and not isinstance(view, sublime.View):
-        raise TypeError('view must be an instance of sublime.View, not %s' % _type_name(view))
 
-    if window is not None and not isinstance(window, sublime.Window):
-        raise TypeError('window must be an instance of sublime.Window, not %s' % _type_name(window))
+@_profiled('project_data')
+def _project_data(window):
+    """
+    Fetches the project data of a window. This requires IPC between
+    plugin_host and sublime_text in ST3.
 
-    st_settings = sublime.load_settings('golang.sublime-settings')
+    :param window:
+        A sublime.Window object
 
-    view_settings = view.settings().get('golang', {}) if view else {}
+    :return:
+        None or a dict of the project data
+    """
 
-    if view and not window:
-        window = view.window()
+    return window.project_data()
 
-    window_settings = {}
-    if window:
-        if sys.version_info >= (3,) and window.project_data():
-            window_settings = window.project_data().get('settings', {}).get('golang', {})
-        elif not view and window.active_view():
-            window_settings = window.active_view().settings().get('golang', {})
 
-    settings_objects = [
-        (view_settings, 'project file'),
-        (window_settings, 'project file'),
-        (st_settings, 'golang.sublime-settings'),
-    ]
+def _check_goroot_executable(executable_name, path, env):
+    """
+    Prints a warning to the console if the executable is not inside of the
+    GOROOT from the env
 
-    for settings_object, source in settings_objects:
-        platform_settings = settings_object.get(_platform, _NO_VALUE)
-        if platform_settings == _NO_VALUE:
-            continue
-        if not isinstance(platform_settings, dict):
-            continue
-        if platform_settings.get(name, _NO_VALUE) != _NO_VALUE:
-            return (platform_settings.get(name), source + ' (os-specific)')
+    :param executable_name:
+        A unicode string of the executable name, e.g. "go"
+
+    :param path:
+        The encoded path to the executable, as used with subprocess.Popen()
 
-    for settings_object, source in settings_objects:
-        result = settings_object.get(name, _NO_VALUE)
-        if result != _NO_VALUE:
-            return (settings_object.get(name), source)
+    :param env:
+        The encoded env dict, as used with subprocess.Popen()
+    """
 
-    return (_NO_VALUE, None)
+    encoded_goroot = _env_encode('GOROOT')
+    if encoded_goroot in env:
+        unicode_sep = shellenv.path_decode(os.sep)
+        name = executable_name
+        if sys.platform == 'win32':
+            name += '.exe'
+        relative_executable_path = _path_encode('bin%s%s' % (unicode_sep, name))
+        goroot_executable_path = os.path.join(env[encoded_goroot], relative_executable_path)
+        if goroot_executable_path != path:
+            print(
+                'golangconfig: warning - binary %s was found at "%s", which is not inside of the GOROOT "%s"' %
+                (
+                    executable_name,
+                    path,
+                    shellenv.path_decode(env[encoded_goroot])
+                )
+            )
 
 
 def _require_unicode(name, value):
@@ -643,7 +3008,7 @@ def _debug_unicode_string(name, value, source):
         )
 
 
-def _check_executable(possible_executable_path, source, setting):
+def _check_executable(possible_executable_path, source, setting, debug):
     """
     Checks to see if a path to an executable exists and that it is, in fact,
     executable. Will display debug info if the path exists, but is not
@@ -658,16 +3023,20 @@ def _check_executable(possible_executable_path, source, setting):
     :param setting:
         A unicode string of the PATH value that the executable was found in
 
+    :param debug:
+        A boolean - if debug information should be printed
+
     :return:
         A boolean - if the possible_executable_path is a file that is executable
     """
 
-    if os.path.exists(possible_executable_path):
-        is_executable = os.path.isfile(possible_executable_path) and os.access(possible_executable_path, os.X_OK)
+    if _fs(os.path.exists, possible_executable_path):
+        is_executable = _fs(os.path.isfile, possible_executable_path) and \
+            _fs(os.access, possible_executable_path, os.X_OK)
         if is_executable:
             return True
 
-        if debug_enabled():
+        if debug:
             executable_name = os.path.basename(possible_executable_path)
             print(
                 'golangconfig: binary %s found in PATH from %s - "%s" - is not executable' %
@@ -679,3 +3048,753 @@ def _check_executable(possible_executable_path, source, setting):
             )
 
     return False
+
+
+def _cached_executable(cache_key):
+    """
+    Looks up an executable in _executable_cache, removing the entry if the
+    executable has changed on disk, or the shell PATH has changed
+
+    :param cache_key:
+        A tuple of (executable name with suffix, PATH setting, PATH setting
+        source)
+
+    :return:
+        None if no valid entry was found, otherwise a two-element tuple of the
+        unicode string path to the executable and the source of the PATH value
+    """
+
+    cached = _executable_cache.get(cache_key)
+    if cached is None:
+        return None
+
+    cached_path, cached_source, cached_shell_path, cached_signature = cached
+    if cached_shell_path is None or cached_shell_path == os.pathsep.join(_shell_path()[1]):
+        if _stat_signature(cached_path) == cached_signature:
+            return (cached_path, cached_source)
+    _executable_cache.pop(cache_key, None)
+    return None
+
+
+def _cached_missing(cache_key):
+    """
+    Checks _missing_executables to see if an executable was recently not
+    found. Once an entry expires, it is renewed if the modification times of
+    the directories searched have not changed. Otherwise the entry, and the
+    listings of the changed directories in _dir_index, are discarded.
+
+    :param cache_key:
+        A tuple of (executable name with suffix, PATH setting, PATH setting
+        source)
+
+    :return:
+        None if the executable is not known to be missing, otherwise the list
+        from _search_trace() of the directories that were searched
+    """
+
+    entry = _missing_executables.get(cache_key)
+    if entry is None:
+        return None
+
+    expires, backoff, shell_path, dir_mtimes, trace = entry
+    if shell_path != os.pathsep.join(_shell_path()[1]):
+        _missing_executables.pop(cache_key, None)
+        return None
+
+    now = time.time()
+    if expires > now:
+        return trace
+
+    if backoff >= _MISSING_MAX_BACKOFF:
+        _missing_executables.pop(cache_key, None)
+        return None
+
+    current_mtimes = _dir_mtimes([dir_ for dir_, _ in dir_mtimes])
+    if current_mtimes != dir_mtimes:
+        _missing_executables.pop(cache_key, None)
+        # A listing of a changed directory in _dir_index may still be within
+        # _DIR_INDEX_TTL, but no longer matches the directory
+        for (dir_, mtime), (_, current_mtime) in zip(dir_mtimes, current_mtimes):
+            if mtime != current_mtime:
+                _dir_index.pop(dir_, None)
+        return None
+
+    backoff = min(backoff * 2, _MISSING_MAX_BACKOFF)
+    entry[0] = now + backoff
+    entry[1] = backoff
+    return trace
+
+
+def _cache_missing(cache_key, trace, shell_path, skipped, started):
+    """
+    Records an executable that could not be found in _missing_executables.
+    Nothing is recorded if any of the directories were skipped by
+    _probe_dirs(), since the executable may be in one of them. Nothing is
+    recorded either if a directory may have changed after the search looked
+    at it: when it was modified after the search started, or when the search
+    used a listing from _dir_index taken before its last modification. Such
+    a listing is discarded.
+
+    :param cache_key:
+        A tuple of (executable name with suffix, PATH setting, PATH setting
+        source)
+
+    :param trace:
+        A list from _search_trace() of the directories that were searched
+
+    :param shell_path:
+        A unicode string of the PATH from the user's login shell
+
+    :param skipped:
+        A set of the unicode string directories skipped by _probe_dirs()
+
+    :param started:
+        A float of the time.time() at which the search started
+    """
+
+    dirs = [dir_ for dir_, _ in trace]
+    for dir_ in dirs:
+        if dir_ in skipped:
+            return
+
+    dir_mtimes = _dir_mtimes(dirs)
+    stale = False
+    for dir_, mtime in dir_mtimes:
+        if mtime is None:
+            continue
+        if mtime >= started:
+            stale = True
+        listing = _dir_index.peek(dir_)
+        if listing is not None and listing[0] != mtime:
+            _dir_index.pop(dir_, None)
+            stale = True
+    if stale:
+        return
+
+    _missing_executables.set(cache_key, [
+        time.time() + _MISSING_MIN_BACKOFF,
+        _MISSING_MIN_BACKOFF,
+        shell_path,
+        dir_mtimes,
+        trace
+    ])
+
+
+def _skipped_dir(dirs, path, skipped):
+    """
+    Checks if any of the directories searched before the one an executable
+    was found in were skipped by _probe_dirs(). Such a result is not cached,
+    since the executable may also be in the skipped directory, which takes
+    precedence.
+
+    :param dirs:
+        A list of unicode strings of the directories searched, in order
+
+    :param path:
+        A unicode string of the path to the executable that was found
+
+    :param skipped:
+        A set of the unicode string directories skipped by _probe_dirs()
+
+    :return:
+        A boolean - if a directory before the executable's was skipped
+    """
+
+    if not skipped:
+        return False
+
+    name = os.path.basename(path)
+    for dir_ in dirs:
+        if os.path.join(dir_, name) == path:
+            return False
+        if dir_ in skipped:
+            return True
+    return False
+
+
+def _search_trace(setting, source, shell_dirs, shell):
+    """
+    Lists the directories searched for an executable, in the order they were
+    searched, without duplicates
+
+    :param setting:
+        None or a unicode string of the PATH setting
+
+    :param source:
+        A unicode string of the source of the PATH setting
+
+    :param shell_dirs:
+        A list of unicode strings of the PATH directories from the user's login
+        shell
+
+    :param shell:
+        A unicode string of the user's login shell
+
+    :return:
+        A list of two-element tuples of the unicode string directory and the
+        unicode string source of the PATH value it is from
+    """
+
+    candidates = []
+    if setting is not None:
+        candidates.extend([(dir_, source) for dir_ in setting.split(os.pathsep)])
+    candidates.extend([(dir_, shell) for dir_ in shell_dirs])
+
+    trace = []
+    seen = set()
+    for dir_, dir_source in candidates:
+        if dir_ in seen:
+            continue
+        seen.add(dir_)
+        trace.append((dir_, dir_source))
+    return trace
+
+
+def _dir_mtimes(dirs):
+    """
+    Fetches the modification time of each directory, to detect when an
+    executable may have been added
+
+    :param dirs:
+        A list of unicode strings of directories
+
+    :return:
+        A tuple of two-element tuples of the directory and its modification
+        time, or None if the directory does not exist
+    """
+
+    output = []
+    for dir_ in dirs:
+        try:
+            mtime = _fs(os.stat, dir_).st_mtime
+        except (OSError):
+            mtime = None
+        output.append((dir_, mtime))
+    return tuple(output)
+
+
+def _list_dir(dir_):
+    """
+    Lists the names of the entries in a directory, for matching against the
+    names of executables
+
+    :param dir_:
+        A unicode string of the path to the directory
+
+    :return:
+        A set of unicode strings of the entry names. The names are lowercased
+        on Windows since the filesystem is case-insensitive. An empty set is
+        returned if the directory can not be read.
+    """
+
+    try:
+        names = _fs(os.listdir, dir_)
+    except (OSError):
+        return set()
+    if sys.platform == 'win32':
+        return set([name.lower() for name in names])
+    return set(names)
+
+
+def _dir_exists(path):
+    """
+    Checks if a path from GOPATH or GOROOT exists, using _existing_dirs to
+    skip the filesystem when the path was recently found
+
+    :param path:
+        A unicode string of the path to check
+
+    :return:
+        A boolean - if the path exists
+    """
+
+    # A path that was found before is already part of the saved state
+    known = _existing_dirs.peek(path) is not None
+    if _existing_dirs.get(path):
+        return True
+
+    if _fs(os.path.exists, path):
+        _existing_dirs.set(path, True)
+        if not known:
+            _schedule_save()
+        return True
+
+    _existing_dirs.pop(path, None)
+    return False
+
+
+def _indexed_dir(dir_):
+    """
+    Returns the entry names of a directory from _dir_index. A listing checked
+    within the last _DIR_INDEX_TTL seconds is returned without touching the
+    filesystem. Otherwise the directory is only listed again if its
+    modification time has changed.
+
+    :param dir_:
+        A unicode string of the path to the directory
+
+    :return:
+        A set of unicode strings of the entry names, as returned by _list_dir()
+    """
+
+    cached = _dir_index.get(dir_)
+    now = time.time()
+    if cached is not None and now - cached[2] < _DIR_INDEX_TTL:
+        return cached[1]
+
+    try:
+        mtime = _fs(os.stat, dir_).st_mtime
+    except (OSError):
+        _dir_index.pop(dir_, None)
+        return set()
+
+    if cached is not None and cached[0] == mtime:
+        _dir_index.set(dir_, (mtime, cached[1], now))
+        return cached[1]
+
+    names = _list_dir(dir_)
+    if now - mtime >= _DIR_INDEX_MIN_AGE:
+        _dir_index.set(dir_, (mtime, names, now))
+    else:
+        _dir_index.pop(dir_, None)
+    return names
+
+
+def _find_in_dirs(dirs, suffixed_name, source, setting, use_index, parallel, skipped, debug):
+    """
+    Searches a list of directories, in order, for an executable
+
+    :param dirs:
+        A list of unicode strings of the directories to search
+
+    :param suffixed_name:
+        A unicode string of the executable name, including ".exe" on Windows
+
+    :param source:
+        A unicode string of the source of the PATH value
+
+    :param setting:
+        A unicode string of the PATH value that dirs is from
+
+    :param use_index:
+        If _dir_index should be used to skip directories that do not contain
+        an entry named suffixed_name
+
+    :param parallel:
+        If the directories should be checked concurrently via _probe_dirs()
+
+    :param skipped:
+        A set that the unicode string directories skipped by _probe_dirs()
+        are added to
+
+    :param debug:
+        A boolean - if debug information should be printed
+
+    :return:
+        None if the executable was not found, otherwise a unicode string of the
+        path to the executable
+    """
+
+    match_name = suffixed_name.lower() if sys.platform == 'win32' else suffixed_name
+
+    def probe(dir_):
+        # The bin directory of a Go installation found by toolchains() is
+        # checked using the list of executables remembered for it
+        goroot, bin_name = os.path.split(dir_)
+        if bin_name == 'bin' and goroot in _toolchains:
+            toolchain = _toolchain(goroot)
+            if toolchain is not None:
+                if match_name in toolchain[1]:
+                    return os.path.join(dir_, suffixed_name)
+                return None
+        if use_index and match_name not in _indexed_dir(dir_):
+            return None
+        possible_executable_path = os.path.join(dir_, suffixed_name)
+        if _check_executable(possible_executable_path, source, setting, debug):
+            return possible_executable_path
+        return None
+
+    if parallel and len(dirs) > 1:
+        return _probe_dirs(dirs, probe, skipped, debug)
+
+    for dir_ in dirs:
+        possible_executable_path = probe(dir_)
+        if possible_executable_path is not None:
+            return possible_executable_path
+    return None
+
+
+def _probe_dirs(dirs, probe, skipped, debug):
+    """
+    Runs a probe function on each directory concurrently, returning the first
+    result in the order of dirs. A directory whose probe runs for longer than
+    _PROBE_TIMEOUT is skipped, and recorded in _dead_dirs so that it is not
+    waited on again for _DEAD_DIRS_TTL seconds.
+
+    Probes are never run on the calling thread. If _probe_pool is busy with
+    other probes, such as ones stuck on a hung mount, a directory whose probe
+    does not start within _PROBE_TIMEOUT of the last probe starting or
+    finishing is skipped without being recorded in _dead_dirs. The same
+    happens when _PROBE_MAX_IN_FLIGHT probes of the directory are already
+    queued or running, or when the directory has a probe queued or running
+    and _PROBE_MAX_STUCK probes are stuck.
+
+    :param dirs:
+        A list of unicode strings of the directories to search
+
+    :param probe:
+        A function that accepts a unicode string directory and returns None
+        or a unicode string of the path to the executable
+
+    :param skipped:
+        A set that the unicode string directories that were not probed, or
+        did not respond, are added to
+
+    :param debug:
+        A boolean - if debug information should be printed
+
+    :return:
+        None if the executable was not found, otherwise a unicode string of the
+        path to the executable
+    """
+
+    global _stuck_probes
+
+    live_dirs = []
+    for dir_ in dirs:
+        if dir_ in live_dirs or dir_ in skipped:
+            continue
+        if _dead_dirs.get(dir_):
+            skipped.add(dir_)
+            continue
+        live_dirs.append(dir_)
+
+    condition = threading.Condition()
+    # The time a probe from this call last started or finished
+    progress = [time.time()]
+
+    # Each element is a list of [start time, finished, result, cancelled,
+    # stuck]
+    states = []
+    for dir_ in live_dirs:
+        state = [None, False, None, False, False]
+        states.append(state)
+
+        with _probes_lock:
+            in_flight = _probes_in_flight.get(dir_, 0)
+            if in_flight >= _PROBE_MAX_IN_FLIGHT or (in_flight and _stuck_probes >= _PROBE_MAX_STUCK):
+                state[3] = True
+                continue
+            _probes_in_flight[dir_] = in_flight + 1
+
+        def task(dir_=dir_, state=state):
+            global _stuck_probes
+
+            try:
+                with condition:
+                    if state[3]:
+                        return
+                    state[0] = time.time()
+                    progress[0] = state[0]
+                    condition.notify_all()
+                result = None
+                try:
+                    result = probe(dir_)
+                finally:
+                    with condition:
+                        state[1] = True
+                        state[2] = result
+                        progress[0] = time.time()
+                        condition.notify_all()
+            finally:
+                with _probes_lock:
+                    _probes_in_flight[dir_] -= 1
+                    if not _probes_in_flight[dir_]:
+                        del _probes_in_flight[dir_]
+                    if state[4]:
+                        _stuck_probes -= 1
+
+        _probe_pool.submit(task)
+
+    try:
+        for dir_, state in zip(live_dirs, states):
+            with condition:
+                while not state[1] and not state[3]:
+                    if state[0] is not None:
+                        remaining = state[0] + _PROBE_TIMEOUT - time.time()
+                    else:
+                        remaining = progress[0] + _PROBE_TIMEOUT - time.time()
+                    if remaining <= 0:
+                        break
+                    condition.wait(remaining)
+                finished = state[1]
+                started = state[0] is not None
+                result = state[2]
+                state[3] = True
+                if started and not finished:
+                    with _probes_lock:
+                        state[4] = True
+                        _stuck_probes += 1
+
+            if finished:
+                if result is not None:
+                    return result
+                continue
+
+            skipped.add(dir_)
+            if started:
+                _dead_dirs.set(dir_, True)
+                if debug:
+                    print('golangconfig: PATH directory "%s" did not respond, skipping' % dir_)
+                if _event_callbacks:
+                    _emit('path_dir_timeout', {'directory': dir_})
+            elif debug:
+                print('golangconfig: PATH directory "%s" could not be probed in time, skipping' % dir_)
+        return None
+
+    finally:
+        # Probes that have not started are no longer needed
+        with condition:
+            for state in states:
+                state[3] = True
+
+
+def _stat_signature(path):
+    """
+    Fetches the details of a file that are used to detect if a cached
+    executable path is still valid
+
+    :param path:
+        A unicode string of the path to the file
+
+    :return:
+        None if the file does not exist, otherwise a tuple of the file's
+        modification time, inode and mode
+    """
+
+    try:
+        st = _fs(os.stat, path)
+    except (OSError):
+        return None
+    return (st.st_mtime, st.st_ino, st.st_mode)
+
+
+def _fs(func, *args):
+    """
+    Calls a function that accesses the filesystem, counting the call in the
+    current thread when _profiling is enabled
+
+    :param func:
+        The function to call, e.g. os.stat
+
+    :param args:
+        The positional arguments to pass to func
+
+    :return:
+        The return value of func
+    """
+
+    if _profiling:
+        _profile_local.fs_calls = getattr(_profile_local, 'fs_calls', 0) + 1
+    return func(*args)
+
+
+def _emit(event, details):
+    """
+    Sends an event to the callbacks registered via add_on_event(). Callers
+    check that _event_callbacks is not empty first, to avoid constructing the
+    details dict when nothing is listening.
+
+    :param event:
+        A unicode string of the event name
+
+    :param details:
+        A dict of information about the event
+    """
+
+    for callback in list(_event_callbacks.values()):
+        try:
+            callback(event, details)
+        except (Exception):
+            traceback.print_exc()
+
+
+def _cache_executable(cache_key, path, source, shell_path):
+    """
+    Records the location of an executable in _executable_cache
+
+    :param cache_key:
+        A tuple of (executable name with suffix, PATH setting, PATH setting
+        source)
+
+    :param path:
+        A unicode string of the path to the executable
+
+    :param source:
+        A unicode string of the source of the PATH value the executable was
+        found in
+
+    :param shell_path:
+        None if the executable was found via the PATH setting, otherwise a
+        unicode string of the PATH from the user's login shell
+    """
+
+    signature = _stat_signature(path)
+    if signature is not None:
+        value = (path, source, shell_path, signature)
+        unchanged = _executable_cache.peek(cache_key) == value
+        _executable_cache.set(cache_key, value)
+        if not unchanged:
+            _schedule_save()
+
+
+def _load_state():
+    """
+    Loads the executable locations and existing directories saved by
+    _save_state() in a previous session of Sublime Text into
+    _executable_cache and _existing_dirs. The entries are then checked
+    against the filesystem in the background. Must be called from the UI
+    thread.
+    """
+
+    global _state_loaded
+    global _state_path
+
+    _state_loaded = True
+
+    cache_dir = sublime.cache_path() if hasattr(sublime, 'cache_path') else None
+    if not cache_dir:
+        return
+    _state_path = os.path.join(cache_dir, 'golangconfig', 'state.json')
+
+    try:
+        with open(_state_path, 'rb') as f:
+            state = json.loads(f.read().decode('utf-8'))
+    except (IOError, OSError, ValueError):
+        return
+
+    if not isinstance(state, dict) or state.get('version') != _STATE_VERSION:
+        return
+
+    try:
+        executables = []
+        for cache_key, path, source, shell_path, signature in state['executables']:
+            cache_key = tuple(cache_key)
+            signature = tuple(signature)
+            if cache_key not in _executable_cache:
+                _executable_cache.set(cache_key, (path, source, shell_path, signature))
+                executables.append(cache_key)
+
+        dirs = []
+        for path in state['dirs']:
+            if path not in _existing_dirs:
+                _existing_dirs.set(path, True)
+                dirs.append(path)
+
+        fingerprint = state['shell']
+    except (KeyError, TypeError, ValueError):
+        return
+
+    _worker_pool.submit(lambda: _revalidate_state(executables, dirs, fingerprint))
+
+
+def _revalidate_state(executables, dirs, fingerprint):
+    """
+    Removes entries loaded by _load_state() that no longer match the
+    filesystem. If the user's shell environment has changed since the state
+    was saved, all of the loaded entries are removed.
+
+    :param executables:
+        A list of the keys of _executable_cache that were loaded
+
+    :param dirs:
+        A list of the unicode string keys of _existing_dirs that were loaded
+
+    :param fingerprint:
+        None or a unicode string of the _env_fingerprint() saved with the
+        state
+    """
+
+    if not executables and not dirs:
+        return
+
+    same_env = fingerprint == _env_fingerprint()
+
+    for cache_key in executables:
+        cached = _executable_cache.get(cache_key)
+        if cached is None:
+            continue
+        if not same_env or _stat_signature(cached[0]) != cached[3]:
+            _executable_cache.pop(cache_key, None)
+
+    for path in dirs:
+        if not same_env or not _fs(os.path.exists, path):
+            _existing_dirs.pop(path, None)
+
+
+def _env_fingerprint():
+    """
+    Creates a hash of the environment of the user's login shell, so changes
+    to it can be detected without saving the values to disk
+
+    :return:
+        A unicode string of the hex digest
+    """
+
+    shell, env = _shell_env()
+    data = json.dumps([shell, sorted(env.items())])
+    return str_cls(hashlib.sha1(data.encode('utf-8')).hexdigest())
+
+
+def _schedule_save():
+    """
+    Arranges for _save_state() to be called once _SAVE_DELAY milliseconds have
+    passed, unless a save is already pending
+    """
+
+    global _save_scheduled
+
+    if _state_path is None or _save_scheduled:
+        return
+    _save_scheduled = True
+    sublime.set_timeout(_save_state, _SAVE_DELAY)
+
+
+def _save_state():
+    """
+    Writes _executable_cache and the keys of _existing_dirs to _state_path.
+    The environment of the user's shell is not saved, only a fingerprint of
+    it. Errors writing the file are ignored, since it is only an optimization.
+    """
+
+    global _save_scheduled
+
+    _save_scheduled = False
+    if _state_path is None:
+        return
+
+    executables = []
+    for cache_key, (path, source, shell_path, signature) in _executable_cache.items():
+        executables.append([list(cache_key), path, source, shell_path, list(signature)])
+    dirs = _existing_dirs.keys()
+
+    state = {
+        'version': _STATE_VERSION,
+        'shell': _env_fingerprint() if executables or dirs else None,
+        'executables': executables,
+        'dirs': dirs,
+    }
+
+    temp_path = _state_path + '.tmp'
+    try:
+        state_dir = os.path.dirname(_state_path)
+        if not os.path.exists(state_dir):
+            os.makedirs(state_dir)
+        with open(temp_path, 'wb') as f:
+            f.write(json.dumps(state, separators=(',', ':')).encode('utf-8'))
+        # os.rename() can not replace a file on Windows
+        if sys.platform == 'win32' and os.path.exists(_state_path):
+            os.remove(_state_path)
+        os.rename(temp_path, _state_path)
+    except (IOError, OSError):
+        pass
@@ -0,0 +1,345 @@
+# coding: utf-8
+from __future__ import unicode_literals, division, absolute_import, print_function
+
+import os
+import sys
+import time
+
+import golangconfig
+from .mocks import GolangConfigMock, CountingOsMock, SlowFilesystemMock
+
+
+if hasattr(time, 'perf_counter'):
+    _timer = time.perf_counter
+elif sys.platform == 'win32':
+    _timer = time.clock
+else:
+    _timer = time.time
+
+
+ITERATIONS = 200
+
+
+def run(iterations=ITERATIONS, baseline=None):
+    """
+    Runs every benchmark and prints a table of the results. Must be called from
+    the UI thread, e.g. via the Sublime Text console:
+
+        from golangconfig.dev import benchmarks; benchmarks.run()
+
+    :param iterations:
+        An integer of the number of times to call the API in each benchmark
+
+    :param baseline:
+        None, or the return value of a previous call to run(), in which case
+        the change in the median of each benchmark is printed
+
+    :return:
+        A dict with unicode string keys of the benchmark names and values of a
+        dict with the keys "p50", "p95" and "max", which are floats of seconds,
+        and "fs_calls", an integer of the filesystem calls made by one call
+    """
+
+    results = []
+    for benchmark in _BENCHMARKS:
+        results.extend(benchmark(iterations))
+
+    print(
+        '%-44s %10s %10s %10s %10s %8s %8s' %
+        ('benchmark', 'calls/sec', 'p50 us', 'p95 us', 'max us', 'fs calls', 'change')
+    )
+    output = {}
+    for name, durations, fs_calls in results:
+        last = len(durations) - 1
+        info = {
+            'p50': durations[int(last * 0.5)],
+            'p95': durations[int(last * 0.95)],
+            'max': durations[last],
+            'fs_calls': fs_calls,
+        }
+        output[name] = info
+
+        change = ''
+        if baseline and name in baseline and baseline[name]['p50'] > 0:
+            change = '%+.0f%%' % ((info['p50'] / baseline[name]['p50'] - 1) * 100)
+
+        total = sum(durations)
+        print(
+            '%-44s %10.0f %10.1f %10.1f %10.1f %8d %8s' %
+            (
+                name,
+                len(durations) / total if total > 0 else 0,
+                info['p50'] * 1000000,
+                info['p95'] * 1000000,
+                info['max'] * 1000000,
+                fs_calls,
+                change
+            )
+        )
+
+    return output
+
+
+def _measure(func, iterations, setup=None):
+    """
+    Calls a function repeatedly, timing each call
+
+    :param func:
+        The function to time
+
+    :param iterations:
+        An integer of the number of calls to make
+
+    :param setup:
+        None or a function to call, untimed, before each call to func
+
+    :return:
+        A sorted list of floats of the durations, in seconds
+    """
+
+    durations = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = _timer()
+        func()
+        durations.append(_timer() - start)
+    return sorted(durations)
+
+
+def _count_fs_calls(func):
+    """
+    Counts the filesystem calls made by golangconfig during a function
+
+    :param func:
+        The function to call
+
+    :return:
+        An integer of the number of filesystem calls
+    """
+
+    with CountingOsMock() as fs_counter:
+        func()
+    return fs_counter.total
+
+
+def _hot_and_cold(name, func, iterations):
+    """
+    Times a function with warm caches, and after calling
+    golangconfig.invalidate() before every call. The filesystem calls of a
+    single call are counted separately, so the counting does not affect the
+    timings.
+
+    :param name:
+        A unicode string of the benchmark name
+
+    :param func:
+        The function to time
+
+    :param iterations:
+        An integer of the number of calls to make
+
+    :return:
+        A list of three-element tuples of the unicode string benchmark name, a
+        sorted list of durations and an integer of the filesystem calls
+    """
+
+    cold = _measure(func, iterations, golangconfig.invalidate)
+    golangconfig.invalidate()
+    cold_fs_calls = _count_fs_calls(func)
+
+    hot = _measure(func, iterations)
+    hot_fs_calls = _count_fs_calls(func)
+
+    return [(name + ' (cold)', cold, cold_fs_calls), (name + ' (hot)', hot, hot_fs_calls)]
+
+
+def _path_dirs(count):
+    """
+    :param count:
+        An integer of the number of directories
+
+    :return:
+        A list of unicode strings of relative directory names
+    """
+
+    return ['dir%d' % i for i in range(count)]
+
+
+def _executable_path_short_path(iterations):
+    env = {
+        'PATH': os.pathsep.join(['{tempdir}bin', '{tempdir}usr/bin', '{tempdir}usr/local/bin'])
+    }
+    with GolangConfigMock('/bin/bash', env, None, None, {}) as mock_context:
+        mock_context.replace_tempdir_env()
+        mock_context.make_executable_files(['usr/local/bin/go'])
+
+        def func():
+            golangconfig.executable_path('go', window=mock_context.window)
+
+        return _hot_and_cold('executable_path() 3 dirs', func, iterations)
+
+
+def _executable_path_long_path(iterations):
+    dirs = _path_dirs(150)
+    env = {
+        'PATH': os.pathsep.join(['{tempdir}' + dir_ for dir_ in dirs])
+    }
+    results = []
+    for path_index in [False, True]:
+        with GolangConfigMock('/bin/bash', env.copy(), None, None, {'path_index': path_index}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(dirs)
+            mock_context.make_executable_files([dirs[-1] + '/go'])
+            # Recently-modified directories are not added to the index
+            old_time = time.time() - 60
+            for dir_ in dirs:
+                os.utime(os.path.join(mock_context.tempdir, dir_), (old_time, old_time))
+
+            def func():
+                golangconfig.executable_path('go', window=mock_context.window)
+
+            name = 'executable_path() 150 dirs'
+            if path_index:
+                name += ', path_index'
+            results.extend(_hot_and_cold(name, func, iterations))
+    return results
+
+
+def _executable_paths_long_path(iterations):
+    dirs = _path_dirs(150)
+    env = {
+        'PATH': os.pathsep.join(['{tempdir}' + dir_ for dir_ in dirs])
+    }
+    names = ['go', 'gofmt', 'guru', 'gocode', 'golint']
+    with GolangConfigMock('/bin/bash', env, None, None, {}) as mock_context:
+        mock_context.replace_tempdir_env()
+        mock_context.make_dirs(dirs)
+        mock_context.make_executable_files([dirs[i * 30] + '/' + name for i, name in enumerate(names)])
+
+        def func():
+            golangconfig.executable_paths(names, window=mock_context.window)
+
+        return _hot_and_cold('executable_paths() 5 names, 150 dirs', func, iterations)
+
+
+def _executable_path_slow_mount(iterations):
+    env = {
+        'PATH': os.pathsep.join(['{tempdir}mnt/nfs', '{tempdir}bin'])
+    }
+    with GolangConfigMock('/bin/bash', env, None, None, {}) as mock_context:
+        mock_context.replace_tempdir_env()
+        mock_context.make_dirs(['mnt/nfs'])
+        mock_context.make_executable_files(['bin/go'])
+
+        def func():
+            golangconfig.executable_path('go', window=mock_context.window)
+
+        # Each cold call waits on the slow mount, so fewer are made
+        slow_dir = os.path.join(mock_context.tempdir, 'mnt', 'nfs')
+        with SlowFilesystemMock({slow_dir: 0.005}):
+            return _hot_and_cold('executable_path() 5ms mount', func, min(iterations, 20))
+
+
+def _setting_value_slow_mount(iterations):
+    env = {
+        'GOPATH': os.pathsep.join(['{tempdir}workspace', '{tempdir}mnt/nfs'])
+    }
+    with GolangConfigMock('/bin/bash', env, None, None, {}) as mock_context:
+        mock_context.replace_tempdir_env()
+        mock_context.make_dirs(['workspace', 'mnt/nfs'])
+
+        def func():
+            golangconfig.setting_value('GOPATH', window=mock_context.window)
+
+        slow_dir = os.path.join(mock_context.tempdir, 'mnt', 'nfs')
+        with SlowFilesystemMock({slow_dir: 0.005}):
+            return _hot_and_cold('setting_value() GOPATH 5ms mount', func, min(iterations, 20))
+
+
+def _setting_value_gopath(iterations):
+    dirs = _path_dirs(50)
+    env = {
+        'GOPATH': os.pathsep.join(['{tempdir}' + dir_ for dir_ in dirs])
+    }
+    with GolangConfigMock('/bin/bash', env, None, None, {}) as mock_context:
+        mock_context.replace_tempdir_env()
+        mock_context.make_dirs(dirs)
+
+        def func():
+            golangconfig.setting_value('GOPATH', window=mock_context.window)
+
+        return _hot_and_cold('setting_value() GOPATH 50 dirs', func, iterations)
+
+
+def _subprocess_info_large_env(iterations):
+    env = {
+        'PATH': '{tempdir}bin',
+        'GOPATH': '{tempdir}workspace',
+    }
+    for i in range(500):
+        env['VAR_%d' % i] = 'value %d' % i
+    with GolangConfigMock('/bin/bash', env, None, None, {}) as mock_context:
+        mock_context.replace_tempdir_env()
+        mock_context.make_executable_files(['bin/go'])
+        mock_context.make_dirs(['workspace'])
+
+        def func():
+            golangconfig.subprocess_info('go', ['GOPATH'], ['GOOS', 'GOARCH'], window=mock_context.window)
+
+        return _hot_and_cold('subprocess_info() 500 env vars', func, iterations)
+
+
+def _subprocess_info_project_settings(iterations):
+    env = {
+        'PATH': '{tempdir}bin',
+    }
+    window_settings = {
+        'GOPATH': '{tempdir}workspace',
+        'osx': {},
+        'windows': {},
+        'linux': {},
+    }
+    view_settings = {
+        'osx': {},
+        'windows': {},
+        'linux': {},
+    }
+    for i in range(100):
+        window_settings['SETTING_%d' % i] = 'value %d' % i
+        view_settings['SETTING_%d' % i] = 'view value %d' % i
+        for platform in ['osx', 'windows', 'linux']:
+            window_settings[platform]['SETTING_%d' % i] = 'os value %d' % i
+            view_settings[platform]['SETTING_%d' % i] = 'view os value %d' % i
+    with GolangConfigMock('/bin/bash', env, view_settings, window_settings, {}) as mock_context:
+        mock_context.replace_tempdir_env()
+        mock_context.replace_tempdir_window_settings()
+        mock_context.make_executable_files(['bin/go'])
+        mock_context.make_dirs(['workspace'])
+        # Each view mock has a new id, so the same one is reused to measure
+        # the per-view settings cache
+        view = mock_context.view
+        window = mock_context.window
+
+        def func():
+            golangconfig.subprocess_info(
+                'go',
+                ['GOPATH'],
+                ['SETTING_0', 'SETTING_50', 'SETTING_99'],
+                view=view,
+                window=window
+            )
+
+        return _hot_and_cold('subprocess_info() 400 project settings', func, iterations)
+
+
+_BENCHMARKS = [
+    _executable_path_short_path,
+    _executable_path_long_path,
+    _executable_paths_long_path,
+    _executable_path_slow_mount,
+    _setting_value_gopath,
+    _setting_value_slow_mount,
+    _subprocess_info_large_env,
+    _subprocess_info_project_settings,
+]
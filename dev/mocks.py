@@ -3,6 +3,8 @@ from __future__ import unicode_literals, division, absolute_import, print_functi
 
 import os
 import sys
+import time
+import errno
 import shutil
 import locale
 import stat
@@ -19,12 +21,20 @@ else:
 
 class SublimeViewMock():
 
+    _next_id = 1
+
     _settings = None
     _context = None
+    _id = None
 
     def __init__(self, settings, context):
         self._settings = settings
         self._context = context
+        self._id = SublimeViewMock._next_id
+        SublimeViewMock._next_id += 1
+
+    def id(self):
+        return self._id
 
     def settings(self):
         if self.window():
@@ -54,6 +64,12 @@ class SublimeWindowMock():
         self._settings = settings
         self._context = context
 
+    def id(self):
+        return 1
+
+    def project_file_name(self):
+        return self._context.project_file_name
+
     def project_data(self):
         if self._settings is None:
             return None
@@ -110,17 +126,31 @@ class ShellenvMock():
 class SublimeSettingsMock():
 
     _values = None
+    _callbacks = None
 
     def __init__(self, values):
         self._values = values
+        self._callbacks = {}
 
     def get(self, name, default=None):
         return self._values.get(name, default)
 
+    def set(self, name, value):
+        self._values[name] = value
+        for callback in list(self._callbacks.values()):
+            callback()
+
+    def add_on_change(self, key, callback):
+        self._callbacks[key] = callback
+
+    def clear_on_change(self, key):
+        self._callbacks.pop(key, None)
+
 
 class SublimeMock():
 
     _settings = None
+    cache_dir = None
     View = SublimeViewMock
     Window = SublimeWindowMock
 
@@ -130,12 +160,159 @@ class SublimeMock():
     def load_settings(self, basename):
         return self._settings
 
+    def set_timeout(self, callback, delay):
+        callback()
+
+    def cache_path(self):
+        return self.cache_dir
+
+
+# The functions of os and os.path that access the filesystem, which are
+# wrapped by CountingOsMock and SlowFilesystemMock
+_FS_FUNCTIONS = set(['exists', 'isfile', 'isdir', 'access', 'stat', 'listdir'])
+
+
+class _OsPathProxy():
+
+    _path = None
+    _wrap = None
+
+    def __init__(self, path, wrap):
+        self._path = path
+        self._wrap = wrap
+
+    def __getattr__(self, name):
+        value = getattr(self._path, name)
+        if name in _FS_FUNCTIONS:
+            return self._wrap(name, value)
+        return value
+
+
+class _OsProxy():
+
+    _os = None
+    _wrap = None
+    path = None
+
+    def __init__(self, os_module, wrap):
+        self._os = os_module
+        self._wrap = wrap
+        self.path = _OsPathProxy(os_module.path, wrap)
+
+    def __getattr__(self, name):
+        value = getattr(self._os, name)
+        if name in _FS_FUNCTIONS:
+            return self._wrap(name, value)
+        return value
+
+
+class CountingOsMock():
+
+    """
+    Replaces the os module used by golangconfig with a proxy that counts the
+    calls to the functions that access the filesystem. Used to enforce upper
+    bounds on the filesystem work done by the public API.
+    """
+
+    _os = None
+    counts = None
+
+    def __init__(self):
+        self.counts = {}
+
+    def _wrap(self, name, func):
+        def wrapper(*args):
+            self.counts[name] = self.counts.get(name, 0) + 1
+            return func(*args)
+        return wrapper
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def reset(self):
+        self.counts.clear()
+
+    def __enter__(self):
+        self._os = golangconfig.os
+        golangconfig.os = _OsProxy(self._os, self._wrap)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        golangconfig.os = self._os
+
+
+class SlowFilesystemMock():
+
+    """
+    Replaces the os module used by golangconfig with a proxy that delays
+    filesystem calls, to simulate directories on network mounts.
+
+    Paths under an unreachable prefix wait for the timeout and then fail, as
+    a hung mount would: os.path.exists(), os.path.isfile(), os.path.isdir()
+    and os.access() return False, and os.stat() and os.listdir() raise
+    OSError.
+    """
+
+    _os = None
+    _delays = None
+    _unreachable = None
+    _timeout = None
+
+    def __init__(self, delays=None, unreachable=None, timeout=1.0):
+        """
+        :param delays:
+            None or a dict with unicode string keys of path prefixes and float
+            values of the seconds to delay each call on a path with the prefix.
+            The longest matching prefix is used.
+
+        :param unreachable:
+            None or a list of unicode string path prefixes that are unreachable
+
+        :param timeout:
+            A float of the seconds a call on an unreachable path takes to fail
+        """
+
+        self._delays = delays or {}
+        self._unreachable = unreachable or []
+        self._timeout = timeout
+
+    def _wrap(self, name, func):
+        def wrapper(*args):
+            path = args[0]
+            for prefix in self._unreachable:
+                if path.startswith(prefix):
+                    time.sleep(self._timeout)
+                    if name in set(['stat', 'listdir']):
+                        raise OSError(errno.ETIMEDOUT, os.strerror(errno.ETIMEDOUT), path)
+                    return False
+
+            delay = 0.0
+            longest = -1
+            for prefix, prefix_delay in self._delays.items():
+                if path.startswith(prefix) and len(prefix) > longest:
+                    delay = prefix_delay
+                    longest = len(prefix)
+            if delay:
+                time.sleep(delay)
+            return func(*args)
+        return wrapper
+
+    def __enter__(self):
+        self._os = golangconfig.os
+        golangconfig.os = _OsProxy(self._os, self._wrap)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        golangconfig.os = self._os
+
 
 class GolangConfigMock():
 
     _shellenv = None
     _sublime = None
     _stdout = None
+    _toolchain_dirs = None
 
     _tempdir = None
 
@@ -145,6 +322,8 @@ class GolangConfigMock():
     _window_settings = None
     _sublime_settings = None
 
+    project_file_name = None
+
     def __init__(self, shell, env, view_settings, window_settings, sublime_settings):
         self._shell = shell
         self._env = env
@@ -225,7 +404,28 @@ class GolangConfigMock():
     def tempdir(self):
         return self._tempdir
 
+    def _reset(self):
+        """
+        Returns the global state of golangconfig to how it is when Sublime Text
+        starts, including the caches that invalidate() keeps
+        """
+
+        golangconfig._state_loaded = False
+        golangconfig._state_path = None
+        golangconfig._save_scheduled = False
+        golangconfig.invalidate()
+        for cache in golangconfig._caches:
+            cache.clear()
+        golangconfig._settings_watched = False
+        golangconfig._profiling = False
+        golangconfig.reset_stats()
+        golangconfig._event_callbacks.clear()
+
     def __enter__(self):
+        self._reset()
+        # Go installations on the machine running the tests are not looked at
+        self._toolchain_dirs = golangconfig._TOOLCHAIN_DIRS
+        golangconfig._TOOLCHAIN_DIRS = []
         self._shellenv = golangconfig.shellenv
         golangconfig.shellenv = ShellenvMock(self._shell, self._env)
         self._sublime = golangconfig.sublime
@@ -237,6 +437,8 @@ class GolangConfigMock():
     def __exit__(self, exc_type, exc_value, traceback):
         golangconfig.shellenv = self._shellenv
         golangconfig.sublime = self._sublime
+        self._reset()
+        golangconfig._TOOLCHAIN_DIRS = self._toolchain_dirs
         temp_stdout = sys.stdout
         sys.stdout = self._stdout
         print(temp_stdout.getvalue(), end='')
@@ -5,6 +5,9 @@ import unittest
 
 import sys
 import os
+import time
+import threading
+import json
 
 if sys.version_info < (3,):
     str_cls = unicode  # noqa
@@ -13,7 +16,7 @@ else:
 
 import shellenv
 import golangconfig
-from .mocks import GolangConfigMock
+from .mocks import GolangConfigMock, CountingOsMock, SlowFilesystemMock
 from .unittest_data import data, data_class
 
 
@@ -242,6 +245,62 @@ class GolangconfigTests(unittest.TestCase):
                     )
                 self.assertRaises(expected_result, do_test)
 
+    def test_env_snapshot(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin',
+            'GOPATH': '{tempdir}gopath',
+        }
+        with GolangConfigMock(shell, env, {'GOOS': 'windows'}, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['usr/bin/go', 'usr/bin/gofmt'])
+            mock_context.make_dirs(['gopath'])
+
+            snapshot = golangconfig.env_snapshot(
+                ['go', 'gofmt'],
+                ['GOPATH'],
+                optional_vars=['GOOS', 'GOARCH'],
+                view=mock_context.view,
+                window=mock_context.window
+            )
+
+            tempdir = mock_context.tempdir + os.sep
+            expected_env = {}
+            for name, value in env.items():
+                expected_env[shellenv.env_encode(name)] = shellenv.env_encode(value)
+            expected_env[shellenv.env_encode('GOOS')] = shellenv.env_encode('windows')
+
+            self.assertEquals(['go', 'gofmt'], snapshot.executable_names)
+            self.assertEquals((tempdir + 'usr/bin/go', shell), snapshot.executable_path('go'))
+            self.assertEquals((env['GOPATH'], shell), snapshot.setting_value('GOPATH'))
+            self.assertEquals(('windows', 'project file'), snapshot.setting_value('GOOS'))
+            self.assertEquals((None, None), snapshot.setting_value('GOARCH'))
+            self.assertEquals(
+                (shellenv.path_encode(tempdir + 'usr/bin/gofmt'), expected_env),
+                snapshot.subprocess_info('gofmt')
+            )
+
+            snapshot.env.clear()
+            self.assertEquals(expected_env, snapshot.env)
+            self.assertRaises(ValueError, lambda: snapshot.subprocess_info('godoc'))
+            self.assertRaises(ValueError, lambda: snapshot.setting_value('GOROOT'))
+            self.assertEqual('', sys.stdout.getvalue())
+
+    def test_env_snapshot_missing_executable(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}gopath',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['gopath'])
+
+            def do_test():
+                golangconfig.env_snapshot(['go', 'guru'], ['GOPATH'], window=mock_context.window)
+            self.assertRaises(golangconfig.ExecutableError, do_test)
+
     @staticmethod
     def executable_path_data():
         return (
@@ -341,6 +400,126 @@ class GolangconfigTests(unittest.TestCase):
             self.assertEquals((None, None), golangconfig.executable_path('go', mock_context.view, mock_context.window))
             self.assertTrue('is not a string' in sys.stdout.getvalue())
 
+    def test_executable_path_cached(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin'
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+
+            tempdir = mock_context.tempdir + os.sep
+            expected_result = (tempdir + 'bin/go', shell)
+            self.assertEquals(expected_result, golangconfig.executable_path('go', mock_context.view))
+            self.assertEquals(1, len(golangconfig._executable_cache))
+            self.assertEquals(expected_result, golangconfig.executable_path('go', mock_context.view))
+
+            os.unlink(os.path.join(mock_context.tempdir, 'bin', 'go'))
+            mock_context.make_executable_files(['usr/bin/go'])
+            self.assertEquals(
+                (tempdir + 'usr/bin/go', shell),
+                golangconfig.executable_path('go', mock_context.view)
+            )
+            self.assertEqual('', sys.stdout.getvalue())
+
+    def test_executable_path_cached_per_path_setting(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin'
+        }
+        with GolangConfigMock(shell, env, {}, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go', 'usr/bin/go'])
+
+            tempdir = mock_context.tempdir + os.sep
+            self.assertEquals((tempdir + 'bin/go', shell), golangconfig.executable_path('go', mock_context.view))
+
+            mock_context._view_settings['PATH'] = tempdir + 'usr/bin'
+            self.assertEquals(
+                (tempdir + 'usr/bin/go', 'project file'),
+                golangconfig.executable_path('go', mock_context.view)
+            )
+            self.assertEquals(2, len(golangconfig._executable_cache))
+
+    def test_executable_path_path_index(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin'
+        }
+        with GolangConfigMock(shell, env, None, None, {'path_index': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(['bin'])
+            mock_context.make_executable_files(['usr/bin/go'])
+
+            bin_dir = os.path.join(mock_context.tempdir, 'bin')
+            usr_bin_dir = os.path.join(mock_context.tempdir, 'usr', 'bin')
+            old_time = time.time() - 60
+            os.utime(bin_dir, (old_time, old_time))
+            os.utime(usr_bin_dir, (old_time, old_time))
+
+            tempdir = mock_context.tempdir + os.sep
+            self.assertEquals((tempdir + 'usr/bin/go', shell), golangconfig.executable_path('go', mock_context.view))
+            self.assertEquals(set(), golangconfig._dir_index.get(tempdir + 'bin')[1])
+            self.assertEquals(set(['go']), golangconfig._dir_index.get(tempdir + 'usr/bin')[1])
+
+            # Listings are kept by invalidate(), and recently-checked
+            # listings are used without touching the filesystem
+            golangconfig.invalidate()
+            with CountingOsMock() as fs_counter:
+                self.assertEquals(
+                    (tempdir + 'usr/bin/go', shell),
+                    golangconfig.executable_path('go', mock_context.view)
+                )
+                # Only the executable that was found is checked
+                self.assertEquals({'exists': 1, 'isfile': 1, 'access': 1, 'stat': 1}, fs_counter.counts)
+
+            # Once the listing is older than _DIR_INDEX_TTL, a new file changes
+            # the directory modification time, so the directory is listed again
+            mock_context.make_executable_files(['bin/go'])
+            mtime, names, _ = golangconfig._dir_index.get(bin_dir)
+            golangconfig._dir_index.set(bin_dir, (mtime, names, time.time() - golangconfig._DIR_INDEX_TTL))
+            golangconfig._executable_cache.clear()
+            self.assertEquals((tempdir + 'bin/go', shell), golangconfig.executable_path('go', mock_context.view))
+            self.assertEqual('', sys.stdout.getvalue())
+
+    def test_executable_paths(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin'
+        }
+        view_settings = {
+            'PATH': '{tempdir}usr/local/bin'
+        }
+        with GolangConfigMock(shell, env, view_settings, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.replace_tempdir_view_settings()
+            mock_context.make_executable_files(['usr/local/bin/gofmt', 'bin/go', 'usr/bin/go', 'usr/bin/godoc'])
+            mock_context.make_files(['bin/godoc'])
+
+            tempdir = mock_context.tempdir + os.sep
+            self.assertEquals(
+                {
+                    'go': (tempdir + 'bin/go', shell),
+                    'gofmt': (tempdir + 'usr/local/bin/gofmt', 'project file'),
+                    'godoc': (tempdir + 'usr/bin/godoc', shell),
+                    'guru': (None, None),
+                },
+                golangconfig.executable_paths(['go', 'gofmt', 'godoc', 'guru'], mock_context.view)
+            )
+            self.assertEquals(3, len(golangconfig._executable_cache))
+            self.assertEquals(
+                (tempdir + 'bin/go', shell),
+                golangconfig.executable_path('go', mock_context.view)
+            )
+            self.assertEqual('', sys.stdout.getvalue())
+
+    def test_executable_paths_not_list(self):
+        with GolangConfigMock('/bin/bash', {'PATH': '/bin'}, None, None, {}) as mock_context:
+            def do_test():
+                golangconfig.executable_paths('go', mock_context.view, mock_context.window)
+            self.assertRaises(TypeError, do_test)
+
     @staticmethod
     def setting_value_gopath_data():
         return (
@@ -564,6 +743,40 @@ class GolangconfigTests(unittest.TestCase):
             )
             self.assertEqual('', sys.stdout.getvalue())
 
+    def test_setting_value_gopath_cached(self):
+        shell = '/bin/bash'
+        env = {
+            'GOPATH': '{tempdir}bin%s{tempdir}usr/bin' % os.pathsep
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(['bin', 'usr/bin'])
+            self.assertEquals(
+                (env['GOPATH'], shell),
+                golangconfig.setting_value('GOPATH', mock_context.view, mock_context.window)
+            )
+
+            tempdir = mock_context.tempdir + os.sep
+            self.assertEquals(
+                set([tempdir + 'bin', tempdir + 'usr/bin']),
+                set(golangconfig._existing_dirs.keys())
+            )
+
+            # Removing a directory is not noticed until the cached result expires
+            os.rmdir(os.path.join(mock_context.tempdir, 'bin'))
+            self.assertEquals(
+                (env['GOPATH'], shell),
+                golangconfig.setting_value('GOPATH', mock_context.view, mock_context.window)
+            )
+
+            # Removing the entry is the same as it expiring
+            golangconfig._existing_dirs.pop(tempdir + 'bin')
+
+            def do_test():
+                golangconfig.setting_value('GOPATH', mock_context.view, mock_context.window)
+            self.assertRaises(golangconfig.GoPathNotFoundError, do_test)
+            self.assertEquals([tempdir + 'usr/bin'], list(golangconfig._existing_dirs.keys()))
+
     def test_setting_value_gopath_not_string(self):
         shell = '/bin/bash'
         env = {
@@ -574,6 +787,238 @@ class GolangconfigTests(unittest.TestCase):
                 golangconfig.setting_value('GOPATH', mock_context.view, mock_context.window)
             self.assertRaises(golangconfig.GoPathNotFoundError, do_test)
 
+    def test_subprocess_info_single_project_data_call(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}gopath',
+        }
+        window_settings = {
+            'GOOS': 'linux',
+            'osx': {'GOARCH': 'amd64'},
+            'windows': {'GOARCH': 'amd64'},
+            'linux': {'GOARCH': 'amd64'},
+        }
+        with GolangConfigMock(shell, env, None, window_settings, {'GOARCH': '386'}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['gopath'])
+
+            window = mock_context.window
+            calls = []
+            original_project_data = window.project_data
+
+            def project_data():
+                calls.append(True)
+                return original_project_data()
+            window.project_data = project_data
+
+            path, result_env = golangconfig.subprocess_info(
+                'go',
+                ['GOPATH'],
+                optional_vars=['GOROOT', 'GOOS', 'GOARCH', 'GOARM'],
+                window=window
+            )
+            # Window.project_data() is only used on ST3
+            self.assertEquals(1 if sys.version_info >= (3,) else 0, len(calls))
+            self.assertEquals(shellenv.env_encode('linux'), result_env[shellenv.env_encode('GOOS')])
+            self.assertEquals(shellenv.env_encode('amd64'), result_env[shellenv.env_encode('GOARCH')])
+            self.assertEqual('', sys.stdout.getvalue())
+
+    def test_subprocess_info_from_snapshot(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}gopath',
+        }
+        with GolangConfigMock(shell, env, {'GOOS': 'windows'}, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['gopath'])
+
+            snapshot = golangconfig.settings_snapshot(['GOPATH', 'GOOS'], view=mock_context.view)
+            self.assertEquals(['GOOS', 'GOPATH', 'PATH'], snapshot.setting_names)
+            self.assertTrue(snapshot.is_current())
+
+            results = []
+
+            def run():
+                try:
+                    results.append(golangconfig.subprocess_info_from_snapshot(snapshot, 'go', ['GOPATH'], ['GOOS']))
+                except (Exception) as e:
+                    results.append(e)
+            thread = threading.Thread(target=run)
+            thread.start()
+            thread.join()
+
+            self.assertEquals(
+                golangconfig.subprocess_info('go', ['GOPATH'], ['GOOS'], view=mock_context.view),
+                results[0]
+            )
+            self.assertEquals(shellenv.env_encode('windows'), results[0][1][shellenv.env_encode('GOOS')])
+
+            def do_test():
+                golangconfig.subprocess_info_from_snapshot(snapshot, 'go', ['GOPATH'], ['GOROOT'])
+            self.assertRaises(ValueError, do_test)
+            self.assertEqual('', sys.stdout.getvalue())
+
+    def test_settings_snapshot_main_thread(self):
+        with GolangConfigMock('/bin/bash', {'PATH': '/bin'}, None, None, {}) as mock_context:
+            results = []
+
+            def run():
+                try:
+                    golangconfig.settings_snapshot(['GOPATH'], window=mock_context.window)
+                except (RuntimeError) as e:
+                    results.append(e)
+            thread = threading.Thread(target=run)
+            thread.start()
+            thread.join()
+            self.assertEquals(1, len(results))
+
+    def test_subprocess_info_async(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}gopath',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['gopath'])
+
+            results = []
+            finished = threading.Event()
+
+            def callback(result, error):
+                results.append((result, error))
+                if len(results) == 2:
+                    finished.set()
+
+            golangconfig.subprocess_info_async('go', ['GOPATH'], window=mock_context.window, callback=callback)
+            golangconfig.subprocess_info_async('guru', ['GOPATH'], window=mock_context.window, callback=callback)
+            finished.wait(10)
+
+            results = sorted(results, key=lambda result: result[1] is not None)
+            self.assertEquals(
+                (golangconfig.subprocess_info('go', ['GOPATH'], window=mock_context.window), None),
+                results[0]
+            )
+            self.assertEquals(None, results[1][0])
+            self.assertTrue(isinstance(results[1][1], golangconfig.ExecutableError))
+            self.assertEquals('guru', results[1][1].name)
+
+    def test_subprocess_info_async_callback_type(self):
+        with GolangConfigMock('/bin/bash', {'PATH': '/bin'}, None, None, {}) as mock_context:
+            def do_test():
+                golangconfig.subprocess_info_async('go', ['GOPATH'], window=mock_context.window, callback=True)
+            self.assertRaises(TypeError, do_test)
+
+    def test_prewarm(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin',
+            'GOPATH': '{tempdir}gopath',
+            'GOROOT': '{tempdir}go',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go', 'usr/bin/gofmt'])
+            mock_context.make_dirs(['gopath'])
+
+            finished = threading.Event()
+            golangconfig.prewarm(
+                ['go', 'gofmt', 'guru'],
+                ['GOPATH', 'GOROOT'],
+                window=mock_context.window,
+                callback=finished.set
+            )
+            finished.wait(10)
+
+            self.assertTrue(finished.is_set())
+            self.assertEquals(2, len(golangconfig._executable_cache))
+            self.assertEquals([mock_context.tempdir + os.sep + 'gopath'], list(golangconfig._existing_dirs.keys()))
+            self.assertEqual('', sys.stdout.getvalue())
+
+    def test_invalidate_on_settings_change(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'GOOS': 'linux'}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+
+            snapshot = golangconfig.env_snapshot(['go'], [], ['GOOS'], window=mock_context.window)
+            self.assertEquals(('linux', 'golang.sublime-settings'), snapshot.setting_value('GOOS'))
+            self.assertTrue(snapshot.is_current())
+
+            # Values from golang.sublime-settings are cached until a change is
+            # reported by Sublime Text
+            st_settings = golangconfig.sublime.load_settings('golang.sublime-settings')
+            st_settings._values['GOOS'] = 'windows'
+            self.assertEquals(
+                ('linux', 'golang.sublime-settings'),
+                golangconfig.setting_value('GOOS', window=mock_context.window)
+            )
+
+            generation = golangconfig.generation()
+            st_settings.set('GOOS', 'darwin')
+            self.assertEquals(generation + 1, golangconfig.generation())
+            self.assertFalse(snapshot.is_current())
+            self.assertEquals(0, len(golangconfig._executable_cache))
+            self.assertEquals(
+                ('darwin', 'golang.sublime-settings'),
+                golangconfig.setting_value('GOOS', window=mock_context.window)
+            )
+
+    def test_invalidate(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}gopath',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['gopath'])
+
+            golangconfig.subprocess_info('go', ['GOPATH'], window=mock_context.window)
+            self.assertEquals(1, len(golangconfig._executable_cache))
+            self.assertEquals(1, len(golangconfig._existing_dirs))
+
+            generation = golangconfig.generation()
+            golangconfig.invalidate()
+            self.assertEquals(generation + 1, golangconfig.generation())
+            self.assertEquals(0, len(golangconfig._executable_cache))
+            self.assertEquals(0, len(golangconfig._existing_dirs))
+
+    def test_subprocess_info_env_cached(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}gopath',
+            'GOOS': 'linux',
+        }
+        with GolangConfigMock(shell, env, {'GOARCH': 'arm'}, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['gopath'])
+
+            _, first_env = golangconfig.subprocess_info('go', ['GOPATH'], ['GOARCH'], view=mock_context.view)
+            self.assertEquals(shellenv.env_encode('arm'), first_env[shellenv.env_encode('GOARCH')])
+            self.assertEquals(2, len(golangconfig._env_cache))
+
+            first_env[shellenv.env_encode('GOOS')] = shellenv.env_encode('windows')
+            _, second_env = golangconfig.subprocess_info('go', ['GOPATH'], ['GOARCH'], view=mock_context.view)
+            self.assertEquals(shellenv.env_encode('linux'), second_env[shellenv.env_encode('GOOS')])
+            self.assertEquals(2, len(golangconfig._env_cache))
+
+            mock_context._view_settings['GOOS'] = None
+            _, third_env = golangconfig.subprocess_info('go', ['GOPATH'], ['GOARCH', 'GOOS'], view=mock_context.view)
+            self.assertFalse(shellenv.env_encode('GOOS') in third_env)
+            self.assertEquals(3, len(golangconfig._env_cache))
+
     def test_subprocess_info_goroot_executable_not_inside(self):
         shell = '/bin/bash'
         env = {
@@ -597,3 +1042,939 @@ class GolangconfigTests(unittest.TestCase):
                 window=mock_context.window
             )
             self.assertTrue('which is not inside of the GOROOT' in sys.stdout.getvalue())
+
+    def test_lru_cache(self):
+        cache = golangconfig._LruCache('test', 4)
+        for i in range(4):
+            cache.set(i, str(i))
+        self.assertEquals('0', cache.get(0))
+        cache.set(4, '4')
+        self.assertEquals(4, len(cache))
+        self.assertEquals('0', cache.get(0))
+        self.assertEquals(None, cache.get(1))
+        self.assertEquals('missing', cache.get(1, 'missing'))
+        self.assertTrue(4 in cache)
+        self.assertEquals([0, 2, 3, 4], sorted(cache.keys()))
+        self.assertEquals(
+            {'entries': 4, 'max_entries': 4, 'hits': 2, 'misses': 2, 'evictions': 1, 'expirations': 0},
+            cache.stats()
+        )
+        cache.clear()
+        self.assertEquals(0, len(cache))
+        cache.reset_stats()
+        self.assertEquals(0, cache.stats()['hits'])
+
+    def test_lru_cache_ttl(self):
+        cache = golangconfig._LruCache('test', 4, 0.05)
+        cache.set('a', 1)
+        self.assertEquals(1, cache.get('a'))
+        time.sleep(0.1)
+        self.assertFalse('a' in cache)
+        self.assertEquals([], cache.items())
+        self.assertEquals(None, cache.get('a'))
+        self.assertEquals(0, len(cache))
+        self.assertEquals(1, cache.stats()['expirations'])
+
+    def test_cache_stats(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+
+            golangconfig.executable_path('go', window=mock_context.window)
+            golangconfig.executable_path('go', window=mock_context.window)
+            info = golangconfig.cache_stats()['executable']
+            self.assertEquals(1, info['entries'])
+            self.assertEquals(1, info['hits'])
+            self.assertEquals(1, info['misses'])
+
+            golangconfig.reset_stats()
+            self.assertEquals(0, golangconfig.cache_stats()['executable']['hits'])
+
+            names = ['dead_dirs', 'dir_index', 'encode', 'env', 'executable', 'existing_dirs', 'go_env',
+                     'missing_executables', 'st_flags', 'st_values', 'toolchains', 'view']
+            self.assertEquals(names, sorted(golangconfig.cache_stats().keys()))
+
+    def test_toolchains(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}usr/bin:{tempdir}go1.20/bin',
+            'GOROOT': '{tempdir}go1.20',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['go1.20/bin/go', 'go1.20/bin/gofmt', 'usr/bin/guru'])
+            with open(os.path.join(mock_context.tempdir, 'go1.20', 'VERSION'), 'wb') as f:
+                f.write(b'go1.20.5\ntime 2023-06-01T20:37:17Z\n')
+            bin_dir = os.path.join(mock_context.tempdir, 'go1.20', 'bin')
+            old_time = time.time() - 60
+            os.utime(bin_dir, (old_time, old_time))
+
+            goroot = mock_context.tempdir + os.sep + 'go1.20'
+            self.assertEquals(
+                [{'goroot': goroot, 'version': 'go1.20.5', 'executables': ['go', 'gofmt']}],
+                golangconfig.toolchains(window=mock_context.window)
+            )
+
+            # The installation is kept by invalidate(), so only the bin
+            # directory needs to be checked to find an executable in it
+            golangconfig.invalidate()
+            self.assertEquals(1, len(golangconfig._toolchains))
+            with CountingOsMock() as fs_counter:
+                self.assertEquals(
+                    (goroot + os.sep + 'bin' + os.sep + 'gofmt', shell),
+                    golangconfig.executable_path('gofmt', window=mock_context.window)
+                )
+                # An exists() for usr/bin, then a stat() of the bin directory
+                # and a stat() to record the file signature
+                self.assertEquals({'exists': 1, 'stat': 2}, fs_counter.counts)
+
+    def test_toolchains_not_goroot(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/gofmt'])
+
+            self.assertEquals([], golangconfig.toolchains(window=mock_context.window))
+            self.assertRaises(TypeError, golangconfig.toolchains, window=1)
+
+    def test_toolchains_install_dirs(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['sdk/go1.20/bin/go', 'sdk/go1.21/bin/go', 'sdk/gotip/bin/gofmt'])
+            golangconfig._TOOLCHAIN_DIRS = [os.path.join(mock_context.tempdir, 'sdk', 'go*')]
+
+            sdk_dir = mock_context.tempdir + os.sep + 'sdk' + os.sep
+            self.assertEquals(
+                [
+                    {'goroot': sdk_dir + 'go1.20', 'version': None, 'executables': ['go']},
+                    {'goroot': sdk_dir + 'go1.21', 'version': None, 'executables': ['go']},
+                ],
+                golangconfig.toolchains(window=mock_context.window)
+            )
+
+    def test_subprocess_info_selected_toolchain(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        window_settings = {
+            'PATH': '{tempdir}sdk/go1.20/bin:{tempdir}bin',
+            'GOROOT': '{tempdir}sdk/go1.20',
+        }
+        with GolangConfigMock(shell, env, None, window_settings, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.replace_tempdir_window_settings()
+            mock_context.make_executable_files(['sdk/go1.20/bin/go', 'bin/go', 'bin/guru'])
+            bin_dir = os.path.join(mock_context.tempdir, 'sdk', 'go1.20', 'bin')
+            old_time = time.time() - 60
+            os.utime(bin_dir, (old_time, old_time))
+
+            golangconfig.toolchains(window=mock_context.window)
+            golangconfig.invalidate()
+
+            # The installation from the GOROOT setting is picked without
+            # looking at the rest of the PATH
+            goroot = mock_context.tempdir + os.sep + 'sdk' + os.sep + 'go1.20'
+            with CountingOsMock() as fs_counter:
+                path, _ = golangconfig.subprocess_info('go', ['GOROOT'], window=mock_context.window)
+                self.assertEquals(shellenv.path_encode(goroot + os.sep + 'bin' + os.sep + 'go'), path)
+                # A stat() of the bin directory, a stat() to record the file
+                # signature and an exists() of GOROOT
+                self.assertEquals({'stat': 2, 'exists': 1}, fs_counter.counts)
+
+            # Executables that are not part of the installation are found in
+            # the rest of the PATH
+            self.assertEquals(
+                (mock_context.tempdir + os.sep + 'bin' + os.sep + 'guru', 'project file'),
+                golangconfig.executable_path('guru', window=mock_context.window)
+            )
+
+    def test_subprocess_info_encode_cached(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}workspace',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['workspace'])
+
+            first = golangconfig.subprocess_info('go', ['GOPATH'], view=mock_context.view)
+            second = golangconfig.subprocess_info('go', ['GOPATH'], view=mock_context.view)
+            self.assertEquals(first, second)
+            if sys.version_info < (3,):
+                self.assertTrue(len(golangconfig._encode_cache) > 0)
+            else:
+                self.assertEquals(0, len(golangconfig._encode_cache))
+
+            golangconfig.invalidate()
+            self.assertEquals(0, len(golangconfig._encode_cache))
+
+    def test_stats(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}workspace',
+        }
+        with GolangConfigMock(shell, env, None, None, {'profile': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['workspace'])
+
+            golangconfig.subprocess_info('go', ['GOPATH'], view=mock_context.view)
+            golangconfig.subprocess_info('go', ['GOPATH'], view=mock_context.view)
+
+            stats = golangconfig.stats()
+            # Profiling is switched on once the settings have been read by the
+            # first call
+            self.assertEquals(1, stats['settings']['count'])
+            for stage in ['subprocess_info', 'executable_path', 'setting_value', 'build_env']:
+                self.assertEquals(2, stats[stage]['count'])
+                self.assertTrue(stats[stage]['p50'] <= stats[stage]['p95'] <= stats[stage]['max'])
+            self.assertTrue(stats['executable_path']['fs_calls'] > 0)
+            self.assertTrue(stats['subprocess_info']['fs_calls'] >= stats['executable_path']['fs_calls'])
+
+            golangconfig.print_stats()
+            self.assertTrue('subprocess_info' in sys.stdout.getvalue())
+
+            golangconfig.reset_stats()
+            self.assertEquals({}, golangconfig.stats())
+
+    def test_stats_disabled(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+
+            golangconfig.executable_path('go', view=mock_context.view)
+            self.assertEquals({}, golangconfig.stats())
+
+    def test_add_on_event(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}workspace',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['workspace'])
+
+            events = []
+            golangconfig.add_on_event('test', lambda event, details: events.append((event, details)))
+
+            golangconfig.subprocess_info('go', ['GOPATH'], view=mock_context.view)
+            self.assertEquals(
+                ['executable_cache_miss', 'executable_found', 'env_cache_miss', 'env_built'],
+                [event for event, _ in events]
+            )
+            self.assertEquals(mock_context.tempdir + os.sep + 'bin' + os.sep + 'go', events[1][1]['path'])
+            self.assertEquals(['GOPATH'], events[3][1]['required_vars'])
+            self.assertEquals([], events[3][1]['missing_vars'])
+
+            del events[:]
+            golangconfig.executable_path('guru', view=mock_context.view)
+            golangconfig.subprocess_info('go', ['GOPATH'], view=mock_context.view)
+            self.assertEquals(
+                ['executable_cache_miss', 'executable_not_found', 'executable_cache_hit', 'env_cache_hit', 'env_built'],
+                [event for event, _ in events]
+            )
+
+            del events[:]
+            golangconfig.clear_on_event('test')
+            golangconfig.subprocess_info('go', ['GOPATH'], view=mock_context.view)
+            self.assertEquals([], events)
+
+    def test_add_on_event_path_not_found(self):
+        shell = '/bin/bash'
+        env = {
+            'GOPATH': '{tempdir}workspace:{tempdir}missing',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(['workspace'])
+
+            events = []
+            golangconfig.add_on_event('test', lambda event, details: events.append((event, details)))
+
+            self.assertRaises(
+                golangconfig.GoPathNotFoundError,
+                golangconfig.setting_value,
+                'GOPATH',
+                view=mock_context.view
+            )
+            self.assertEquals(
+                [('path_not_found', {'name': 'GOPATH', 'directories': [mock_context.tempdir + os.sep + 'missing']})],
+                events
+            )
+
+    def test_add_on_event_not_callable(self):
+        self.assertRaises(TypeError, golangconfig.add_on_event, 'test', None)
+
+    def test_executable_path_fs_calls(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin:{tempdir}usr/local/bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['usr/local/bin/go'])
+
+            with CountingOsMock() as fs_counter:
+                golangconfig.executable_path('go', window=mock_context.window)
+                # An exists() for each directory, then isfile(), access() and
+                # a stat() to record the file signature
+                self.assertTrue(fs_counter.total <= 6)
+
+                fs_counter.reset()
+                golangconfig.executable_path('go', window=mock_context.window)
+                self.assertEquals({'stat': 1}, fs_counter.counts)
+
+    def test_setting_value_fs_calls(self):
+        shell = '/bin/bash'
+        env = {
+            'GOPATH': '{tempdir}workspace:{tempdir}workspace2',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(['workspace', 'workspace2'])
+
+            with CountingOsMock() as fs_counter:
+                golangconfig.setting_value('GOPATH', window=mock_context.window)
+                self.assertEquals({'exists': 2}, fs_counter.counts)
+
+                fs_counter.reset()
+                golangconfig.setting_value('GOPATH', window=mock_context.window)
+                self.assertEquals(0, fs_counter.total)
+
+    def test_subprocess_info_fs_calls(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}workspace',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['workspace'])
+
+            golangconfig.subprocess_info('go', ['GOPATH'], window=mock_context.window)
+            with CountingOsMock() as fs_counter:
+                golangconfig.subprocess_info('go', ['GOPATH'], window=mock_context.window)
+                self.assertEquals({'stat': 1}, fs_counter.counts)
+
+    def test_executable_path_slow_fs(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}mnt/slow:{tempdir}mnt/down:{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['mnt/slow'])
+
+            slow_dir = mock_context.tempdir + os.sep + 'mnt' + os.sep + 'slow'
+            down_dir = mock_context.tempdir + os.sep + 'mnt' + os.sep + 'down'
+            with SlowFilesystemMock({slow_dir: 0.05}, [down_dir], timeout=0.1):
+                start = time.time()
+                self.assertEquals(
+                    (mock_context.tempdir + os.sep + 'bin' + os.sep + 'go', shell),
+                    golangconfig.executable_path('go', window=mock_context.window)
+                )
+                self.assertTrue(time.time() - start >= 0.15)
+
+                # The cached location does not touch the slow directories
+                start = time.time()
+                golangconfig.executable_path('go', window=mock_context.window)
+                self.assertTrue(time.time() - start < 0.05)
+
+    def test_setting_value_slow_fs(self):
+        shell = '/bin/bash'
+        env = {
+            'GOPATH': '{tempdir}mnt/slow:{tempdir}mnt/down',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(['mnt/slow', 'mnt/down'])
+
+            slow_dir = mock_context.tempdir + os.sep + 'mnt' + os.sep + 'slow'
+            down_dir = mock_context.tempdir + os.sep + 'mnt' + os.sep + 'down'
+            with SlowFilesystemMock({slow_dir: 0.05}, [down_dir], timeout=0.1):
+                start = time.time()
+                self.assertRaises(
+                    golangconfig.GoPathNotFoundError,
+                    golangconfig.setting_value,
+                    'GOPATH',
+                    window=mock_context.window
+                )
+                self.assertTrue(time.time() - start >= 0.15)
+
+            with SlowFilesystemMock({slow_dir: 0.05}):
+                golangconfig.setting_value('GOPATH', window=mock_context.window)
+
+                # Directories that exist are remembered, so the slow mount is
+                # not checked again
+                start = time.time()
+                golangconfig.setting_value('GOPATH', window=mock_context.window)
+                self.assertTrue(time.time() - start < 0.05)
+
+    def test_executable_path_parallel_path_not_cached(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}mnt/slow:{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'parallel_path': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['mnt/slow/go', 'bin/go'])
+
+            slow_dir = mock_context.tempdir + os.sep + 'mnt' + os.sep + 'slow'
+            with SlowFilesystemMock({slow_dir: golangconfig._PROBE_TIMEOUT + 0.1}):
+                self.assertEquals(
+                    (mock_context.tempdir + os.sep + 'bin' + os.sep + 'go', shell),
+                    golangconfig.executable_path('go', window=mock_context.window)
+                )
+            self.assertEquals([slow_dir], golangconfig._dead_dirs.keys())
+
+            # A location found after skipping a directory is not cached, so
+            # once the directory responds again it takes precedence
+            self.assertEquals(0, len(golangconfig._executable_cache))
+            golangconfig._dead_dirs.pop(slow_dir)
+            self.assertEquals(
+                (slow_dir + os.sep + 'go', shell),
+                golangconfig.executable_path('go', window=mock_context.window)
+            )
+
+    def test_executable_path_parallel_path(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}mnt/down:{tempdir}mnt/slow:{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'parallel_path': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['mnt/slow/go', 'bin/go'])
+
+            slow_dir = mock_context.tempdir + os.sep + 'mnt' + os.sep + 'slow'
+            down_dir = mock_context.tempdir + os.sep + 'mnt' + os.sep + 'down'
+            with SlowFilesystemMock({slow_dir: 0.1}, [down_dir], timeout=1.0):
+                start = time.time()
+                # The slow directory comes first in the PATH, so it is used
+                # even though bin/ responds sooner
+                self.assertEquals(
+                    (slow_dir + os.sep + 'go', shell),
+                    golangconfig.executable_path('go', window=mock_context.window)
+                )
+                self.assertTrue(time.time() - start < 1.0)
+                self.assertEquals([down_dir], list(golangconfig._dead_dirs.keys()))
+
+    def test_executable_path_parallel_path_per_dir_timeout(self):
+        shell = '/bin/bash'
+        dirs = ['mnt/d%02d' % i for i in range(40)]
+        env = {
+            'PATH': ':'.join(['{tempdir}' + dir_ for dir_ in dirs]),
+        }
+        with GolangConfigMock(shell, env, None, None, {'parallel_path': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(dirs)
+            mock_context.make_executable_files([dirs[-1] + '/go'])
+
+            mnt_dir = mock_context.tempdir + os.sep + 'mnt'
+            go_path = mnt_dir + os.sep + 'd39' + os.sep + 'go'
+            # Together the probes take longer than _PROBE_TIMEOUT, but each
+            # directory responds within it
+            with SlowFilesystemMock({mnt_dir: golangconfig._PROBE_TIMEOUT * 0.2}):
+                self.assertEquals((go_path, shell), golangconfig.executable_path('go', window=mock_context.window))
+            self.assertEquals([], golangconfig._dead_dirs.keys())
+            self.assertEquals(1, len(golangconfig._executable_cache))
+
+    def test_executable_path_parallel_path_in_flight_limit(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}mnt/down:{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'parallel_path': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+
+            go_path = mock_context.tempdir + os.sep + 'bin' + os.sep + 'go'
+            down_dir = mock_context.tempdir + os.sep + 'mnt' + os.sep + 'down'
+            timeout = golangconfig._PROBE_TIMEOUT * 3
+            with SlowFilesystemMock({}, [down_dir], timeout=timeout):
+                for _ in range(golangconfig._PROBE_MAX_IN_FLIGHT):
+                    self.assertEquals((go_path, shell), golangconfig.executable_path('go', window=mock_context.window))
+                    self.assertEquals([down_dir], golangconfig._dead_dirs.keys())
+                    golangconfig._dead_dirs.pop(down_dir)
+
+                # The directory is not probed again while earlier probes of
+                # it are stuck, and is not recorded as dead since it was not
+                # probed
+                start = time.time()
+                self.assertEquals((go_path, shell), golangconfig.executable_path('go', window=mock_context.window))
+                self.assertTrue(time.time() - start < golangconfig._PROBE_TIMEOUT)
+                self.assertEquals([], golangconfig._dead_dirs.keys())
+                self.assertEquals(0, len(golangconfig._executable_cache))
+
+                while golangconfig._probes_in_flight:
+                    time.sleep(0.05)
+
+    def test_executable_path_parallel_path_hung_mounts(self):
+        shell = '/bin/bash'
+        hung_dirs = ['mnt/hung%d' % i for i in range(golangconfig._PROBE_MAX_STUCK + 1)]
+        env = {
+            'PATH': ':'.join(['{tempdir}' + dir_ for dir_ in hung_dirs]) + ':{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'parallel_path': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+
+            go_path = mock_context.tempdir + os.sep + 'bin' + os.sep + 'go'
+            mnt_dir = mock_context.tempdir + os.sep + 'mnt'
+            with SlowFilesystemMock({}, [mnt_dir], timeout=golangconfig._PROBE_TIMEOUT * 6):
+                # Once the hung mounts are no longer skipped as dead, they are
+                # not probed again while their earlier probes are stuck, so
+                # there are threads left to probe bin/
+                for _ in range(3):
+                    self.assertEquals((go_path, shell), golangconfig.executable_path('go', window=mock_context.window))
+                    golangconfig._dead_dirs.clear()
+                    golangconfig._executable_cache.clear()
+                self.assertEquals(len(hung_dirs), golangconfig._stuck_probes)
+
+                while golangconfig._probes_in_flight:
+                    time.sleep(0.05)
+                self.assertEquals(0, golangconfig._stuck_probes)
+
+    def test_executable_path_missing_cached(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(['bin', 'usr/bin'])
+
+            self.assertEquals((None, None), golangconfig.executable_path('guru', window=mock_context.window))
+            self.assertEquals(1, len(golangconfig._missing_executables))
+
+            with CountingOsMock() as fs_counter:
+                self.assertRaises(
+                    golangconfig.ExecutableError,
+                    golangconfig.subprocess_info,
+                    'guru',
+                    [],
+                    window=mock_context.window
+                )
+                self.assertEquals(0, fs_counter.total)
+
+            # Once expired, the entry is renewed for longer if the directories
+            # have not changed
+            entry = golangconfig._missing_executables.items()[0][1]
+            entry[0] = 0
+            with CountingOsMock() as fs_counter:
+                golangconfig.executable_path('guru', window=mock_context.window)
+                self.assertEquals({'stat': 2}, fs_counter.counts)
+            self.assertEquals(golangconfig._MISSING_MIN_BACKOFF * 2, entry[1])
+
+            # Installing the executable changes the directory modification time
+            time.sleep(0.01)
+            mock_context.make_executable_files(['usr/bin/guru'])
+            entry[0] = 0
+            self.assertEquals(
+                (mock_context.tempdir + os.sep + 'usr' + os.sep + 'bin' + os.sep + 'guru', shell),
+                golangconfig.executable_path('guru', window=mock_context.window)
+            )
+            self.assertEquals(0, len(golangconfig._missing_executables))
+
+    def test_executable_path_missing_cached_path_index(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'path_index': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(['bin', 'usr/bin'])
+
+            bin_dir = os.path.join(mock_context.tempdir, 'bin')
+            usr_bin_dir = os.path.join(mock_context.tempdir, 'usr', 'bin')
+            old_time = time.time() - 60
+            os.utime(bin_dir, (old_time, old_time))
+            os.utime(usr_bin_dir, (old_time, old_time))
+
+            self.assertEquals((None, None), golangconfig.executable_path('guru', window=mock_context.window))
+            self.assertEquals(1, len(golangconfig._missing_executables))
+            self.assertEquals(2, len(golangconfig._dir_index))
+
+            # The listing of bin/ is still within _DIR_INDEX_TTL when the miss
+            # expires, but is not used since the directory changed
+            mock_context.make_executable_files(['bin/guru'])
+            for _ in range(3):
+                for _, entry in golangconfig._missing_executables.items():
+                    entry[0] = 0
+                self.assertEquals(
+                    (bin_dir + os.sep + 'guru', shell),
+                    golangconfig.executable_path('guru', window=mock_context.window)
+                )
+                golangconfig._executable_cache.clear()
+            self.assertEquals(0, len(golangconfig._missing_executables))
+
+            # A miss is not recorded when the search used a listing taken
+            # before the directory changed, and the listing is discarded
+            mock_context.make_executable_files(['usr/bin/gorename'])
+            new_time = time.time() - 30
+            os.utime(usr_bin_dir, (new_time, new_time))
+            self.assertEquals((None, None), golangconfig.executable_path('gorename', window=mock_context.window))
+            self.assertEquals(0, len(golangconfig._missing_executables))
+            self.assertEquals(None, golangconfig._dir_index.get(usr_bin_dir))
+            self.assertEquals(
+                (usr_bin_dir + os.sep + 'gorename', shell),
+                golangconfig.executable_path('gorename', window=mock_context.window)
+            )
+
+    def test_executable_path_missing_not_cached_after_change(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(['bin', 'usr/bin'])
+
+            # A directory modified after the search started may have gained
+            # the executable after it was looked at
+            future_time = time.time() + 60
+            usr_bin_dir = os.path.join(mock_context.tempdir, 'usr', 'bin')
+            os.utime(usr_bin_dir, (future_time, future_time))
+            self.assertEquals((None, None), golangconfig.executable_path('guru', window=mock_context.window))
+            self.assertEquals(0, len(golangconfig._missing_executables))
+
+    def test_subprocess_info_executable_error_dirs(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin',
+        }
+        window_settings = {
+            'PATH': '{tempdir}usr/bin:{tempdir}go/bin:{tempdir}go/bin',
+        }
+        with GolangConfigMock(shell, env, None, window_settings, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.replace_tempdir_window_settings()
+            mock_context.make_dirs(['bin', 'usr/bin', 'go/bin'])
+
+            expected = [
+                mock_context.tempdir + os.sep + 'usr/bin',
+                mock_context.tempdir + os.sep + 'go/bin',
+                mock_context.tempdir + os.sep + 'bin',
+            ]
+            for _ in range(2):
+                try:
+                    golangconfig.subprocess_info('guru', [], window=mock_context.window)
+                    self.fail('ExecutableError not raised')
+                except (golangconfig.ExecutableError) as e:
+                    self.assertEquals(expected, e.dirs)
+
+    def test_subprocess_info_executable_error_dirs_no_setting(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_dirs(['bin', 'usr/bin'])
+
+            expected = [
+                mock_context.tempdir + os.sep + 'bin',
+                mock_context.tempdir + os.sep + 'usr/bin',
+            ]
+            try:
+                golangconfig.subprocess_info('guru', [], window=mock_context.window)
+                self.fail('ExecutableError not raised')
+            except (golangconfig.ExecutableError) as e:
+                self.assertEquals(expected, e.dirs)
+                self.assertTrue(golangconfig._NO_VALUE not in str_cls(e))
+
+            # The directories recorded by executable_paths() are used for
+            # executables it could not find
+            golangconfig.executable_paths(['gorename'], window=mock_context.window)
+            try:
+                golangconfig.subprocess_info('gorename', [], window=mock_context.window)
+                self.fail('ExecutableError not raised')
+            except (golangconfig.ExecutableError) as e:
+                self.assertEquals(expected, e.dirs)
+
+    def test_state_saved(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}workspace',
+            'API_TOKEN': 'secret-value',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['workspace'])
+            golangconfig.sublime.cache_dir = mock_context.tempdir + os.sep + 'cache'
+
+            golangconfig.subprocess_info('go', ['GOPATH'], window=mock_context.window)
+
+            state_path = os.path.join(mock_context.tempdir, 'cache', 'golangconfig', 'state.json')
+            with open(state_path, 'rb') as f:
+                state_json = f.read().decode('utf-8')
+            self.assertFalse('secret-value' in state_json)
+            state = json.loads(state_json)
+            self.assertEquals([mock_context.tempdir + os.sep + 'workspace'], state['dirs'])
+            self.assertEquals(mock_context.tempdir + os.sep + 'bin' + os.sep + 'go', state['executables'][0][1])
+
+            golangconfig.invalidate()
+            with open(state_path, 'rb') as f:
+                state = json.loads(f.read().decode('utf-8'))
+            self.assertEquals([], state['executables'])
+            self.assertEquals([], state['dirs'])
+
+    def test_state_not_saved_on_refresh(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+            'GOPATH': '{tempdir}workspace',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['workspace'])
+            golangconfig.sublime.cache_dir = mock_context.tempdir + os.sep + 'cache'
+
+            golangconfig.subprocess_info('go', ['GOPATH'], window=mock_context.window)
+
+            state_path = os.path.join(mock_context.tempdir, 'cache', 'golangconfig', 'state.json')
+            os.remove(state_path)
+
+            # Checking a directory again once it has expired, or finding the
+            # same executable again, does not change the saved state
+            workspace_dir = mock_context.tempdir + os.sep + 'workspace'
+            golangconfig._existing_dirs._data[workspace_dir][2] = time.time() - 1
+            cache_key = golangconfig._executable_cache.keys()[0]
+            path, source, shell_path, _ = golangconfig._executable_cache.get(cache_key)
+            golangconfig._cache_executable(cache_key, path, source, shell_path)
+            golangconfig.setting_value('GOPATH', window=mock_context.window)
+            self.assertTrue(workspace_dir in golangconfig._existing_dirs)
+            self.assertFalse(os.path.exists(state_path))
+
+    def test_state_loaded(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin:{tempdir}usr/bin',
+            'GOPATH': '{tempdir}workspace',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go', 'usr/bin/gofmt'])
+            mock_context.make_dirs(['workspace'])
+            golangconfig.sublime.cache_dir = mock_context.tempdir + os.sep + 'cache'
+
+            golangconfig.executable_paths(['go', 'gofmt'], window=mock_context.window)
+            golangconfig.setting_value('GOPATH', window=mock_context.window)
+
+            # Simulate restarting Sublime Text, with gofmt removed while it
+            # was closed
+            os.remove(os.path.join(mock_context.tempdir, 'usr', 'bin', 'gofmt'))
+            golangconfig._executable_cache.clear()
+            golangconfig._existing_dirs.clear()
+            golangconfig._state_loaded = False
+
+            submitted = []
+
+            class WorkerPoolMock():
+                def submit(self, func):
+                    submitted.append(func)
+
+            worker_pool = golangconfig._worker_pool
+            golangconfig._worker_pool = WorkerPoolMock()
+            try:
+                golangconfig.setting_value('GOPATH', window=mock_context.window)
+            finally:
+                golangconfig._worker_pool = worker_pool
+
+            self.assertEquals(2, len(golangconfig._executable_cache))
+            self.assertEquals([mock_context.tempdir + os.sep + 'workspace'], list(golangconfig._existing_dirs.keys()))
+
+            # The background check removes the executable that no longer exists
+            self.assertEquals(1, len(submitted))
+            submitted[0]()
+            self.assertEquals(1, len(golangconfig._executable_cache))
+
+            with CountingOsMock() as fs_counter:
+                golangconfig.executable_path('go', window=mock_context.window)
+                golangconfig.setting_value('GOPATH', window=mock_context.window)
+                self.assertEquals({'stat': 1}, fs_counter.counts)
+
+    def test_setting_value_go_env(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'go_env': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['go', 'gopath'])
+
+            go_path = os.path.join(mock_context.tempdir, 'bin', 'go')
+            count_path = os.path.join(mock_context.tempdir, 'count')
+            template = (
+                '#!/bin/sh\n'
+                'echo run >> "%s"\n'
+                'echo \'{"GOROOT": "%s", "GOPATH": "%s", "GOOS": "linux", "GOCACHE": ""}\'\n'
+            )
+            with open(go_path, 'wb') as f:
+                f.write((template % (
+                    count_path,
+                    os.path.join(mock_context.tempdir, 'go'),
+                    os.path.join(mock_context.tempdir, 'gopath')
+                )).encode('utf-8'))
+
+            self.assertEquals(
+                (os.path.join(mock_context.tempdir, 'go'), 'go env'),
+                golangconfig.setting_value('GOROOT', window=mock_context.window)
+            )
+            self.assertEquals(
+                (os.path.join(mock_context.tempdir, 'gopath'), 'go env'),
+                golangconfig.setting_value('GOPATH', window=mock_context.window)
+            )
+            self.assertEquals((None, None), golangconfig.setting_value('GOOS', window=mock_context.window))
+            self.assertEquals((None, None), golangconfig.setting_value('GOCACHE', window=mock_context.window))
+
+            with open(count_path, 'rb') as f:
+                self.assertEquals(1, len(f.read().splitlines()))
+
+    def test_setting_value_go_env_missing_gopath(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'go_env': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+
+            go_path = os.path.join(mock_context.tempdir, 'bin', 'go')
+            gopath = os.path.join(mock_context.tempdir, 'home', 'go')
+            with open(go_path, 'wb') as f:
+                f.write(('#!/bin/sh\necho \'{"GOPATH": "%s"}\'\n' % gopath).encode('utf-8'))
+
+            # The default GOPATH reported by go does not exist until it is used
+            self.assertEquals((gopath, 'go env'), golangconfig.setting_value('GOPATH', window=mock_context.window))
+            self.assertEquals(0, len(golangconfig._existing_dirs))
+
+    def test_setting_value_go_env_timeout(self):
+        if sys.version_info < (3,):
+            return
+
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'go_env': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+
+            go_path = os.path.join(mock_context.tempdir, 'bin', 'go')
+            with open(go_path, 'wb') as f:
+                f.write(b'#!/bin/sh\nexec sleep 5\n')
+
+            timeout = golangconfig._GO_ENV_TIMEOUT
+            golangconfig._GO_ENV_TIMEOUT = 0.1
+            try:
+                start = time.time()
+                self.assertEquals((None, None), golangconfig.setting_value('GOROOT', window=mock_context.window))
+                self.assertTrue(time.time() - start < 2.0)
+                self.assertEquals(1, len(golangconfig._go_env_cache))
+            finally:
+                golangconfig._GO_ENV_TIMEOUT = timeout
+
+    def test_setting_value_go_env_failure_retried(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {'go_env': True}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+            mock_context.make_dirs(['go'])
+
+            go_path = os.path.join(mock_context.tempdir, 'bin', 'go')
+            goroot = os.path.join(mock_context.tempdir, 'go')
+            fixed_path = os.path.join(mock_context.tempdir, 'fixed')
+            template = (
+                '#!/bin/sh\n'
+                '[ -f "%s" ] || exit 1\n'
+                'echo \'{"GOROOT": "%s"}\'\n'
+            )
+            with open(go_path, 'wb') as f:
+                f.write((template % (fixed_path, goroot)).encode('utf-8'))
+
+            self.assertEquals((None, None), golangconfig.setting_value('GOROOT', window=mock_context.window))
+            signature, values, retry, backoff = golangconfig._go_env_cache.get(go_path)
+            self.assertEquals({}, values)
+            self.assertEquals(golangconfig._MISSING_MIN_BACKOFF, backoff)
+
+            # Once the toolchain is fixed, go is run again after the backoff,
+            # without the go executable changing
+            with open(fixed_path, 'wb'):
+                pass
+            self.assertEquals((None, None), golangconfig.setting_value('GOROOT', window=mock_context.window))
+            golangconfig._go_env_cache.set(go_path, (signature, values, 0, backoff))
+            self.assertEquals((goroot, 'go env'), golangconfig.setting_value('GOROOT', window=mock_context.window))
+            self.assertEquals(None, golangconfig._go_env_cache.get(go_path)[2])
+
+    def test_setting_value_go_env_disabled(self):
+        shell = '/bin/bash'
+        env = {
+            'PATH': '{tempdir}bin',
+        }
+        with GolangConfigMock(shell, env, None, None, {}) as mock_context:
+            mock_context.replace_tempdir_env()
+            mock_context.make_executable_files(['bin/go'])
+
+            self.assertEquals((None, None), golangconfig.setting_value('GOROOT', window=mock_context.window))
+            self.assertEquals(0, len(golangconfig._go_env_cache))
+
+    def test_setting_value_view_cached(self):
+        shell = '/bin/bash'
+        env = {}
+        with GolangConfigMock(shell, env, {'GOOS': 'linux'}, {'GOARCH': 'amd64'}, {}) as mock_context:
+            mock_context.project_file_name = '/projects/one.sublime-project'
+            view = mock_context.view
+
+            self.assertEquals(('linux', 'project file'), golangconfig.setting_value('GOOS', view=view))
+
+            def fail():
+                raise AssertionError('Sublime Text API called')
+
+            # Further calls with the view do not fetch its settings
+            settings = view.settings
+            view.settings = fail
+            self.assertEquals(('amd64', 'project file'), golangconfig.setting_value('GOARCH', view=view))
+
+            # A different project file in the window is a cache miss
+            view.settings = settings
+            mock_context._view_settings['GOOS'] = 'darwin'
+            mock_context.project_file_name = '/projects/two.sublime-project'
+            self.assertEquals(('darwin', 'project file'), golangconfig.setting_value('GOOS', view=view))
+
+            mock_context._view_settings['GOOS'] = 'windows'
+            golangconfig.view_closed(view)
+            self.assertEquals(('windows', 'project file'), golangconfig.setting_value('GOOS', view=view))
+            self.assertEquals(1, len(golangconfig._view_cache))
+
+    def test_view_closed_type(self):
+        self.assertRaises(TypeError, golangconfig.view_closed, None)